@@ -5,7 +5,7 @@ a = Analysis(
     ['jogo_letras_gui.py'],
     pathex=[],
     binaries=[],
-    datas=[('fundo.png', '.'), ('acerto.mp3', '.'), ('erro.mp3', '.'), ('musica_fundo.mp3', '.'), ('DejaVuSans.ttf', '.')],
+    datas=[('assets.pak', '.')],  # gerado por pacote_assets.py antes do build
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
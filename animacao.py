@@ -0,0 +1,88 @@
+"""Agendador de animações (tweens) avançado uma vez por quadro pelo loop principal.
+
+Um tween leva o atributo de um objeto de um valor a outro em `duracao_ms`, seguindo uma curva
+de easing. Tweens podem ser encadeados (`em_seguida`) e cancelados, individualmente ou pela
+chave: um tween novo com a mesma chave substitui o anterior. Nada aqui bloqueia o loop.
+"""
+
+
+# --- Curvas de easing: recebem e devolvem um valor entre 0 e 1 ---
+def linear(t):
+    return t
+
+
+def ease_out_quad(t):
+    return 1 - (1 - t) * (1 - t)
+
+
+def ease_in_out_quad(t):
+    return 2 * t * t if t < 0.5 else 1 - (-2 * t + 2) ** 2 / 2
+
+
+class Tween:
+    __slots__ = ("agendador", "alvo", "atributo", "inicio", "fim", "duracao", "decorrido", "easing",
+                 "ao_terminar", "seguintes", "cancelado", "chave")
+
+    def __init__(self, agendador, alvo, atributo, inicio, fim, duracao_ms, easing=linear, ao_terminar=None, chave=None):
+        self.agendador, self.alvo, self.atributo = agendador, alvo, atributo
+        self.inicio, self.fim, self.duracao, self.decorrido = inicio, fim, max(duracao_ms, 1e-9), 0.0
+        self.easing, self.ao_terminar, self.chave = easing, ao_terminar, chave
+        self.seguintes, self.cancelado = [], False
+
+    def em_seguida(self, alvo, atributo, inicio, fim, duracao_ms, easing=linear, ao_terminar=None):
+        """Cria um tween que só começa quando este terminar (mantém a mesma chave)."""
+        seguinte = Tween(self.agendador, alvo, atributo, inicio, fim, duracao_ms, easing, ao_terminar, self.chave)
+        self.seguintes.append(seguinte)
+        return seguinte
+
+    def cancelar(self):
+        """Para o tween onde está; os encadeados a seguir já não começam."""
+        self.cancelado = True
+
+    def avancar(self, dt_ms):
+        """Devolve True quando o tween terminou."""
+        self.decorrido = min(self.decorrido + dt_ms, self.duracao)
+        progresso = self.decorrido / self.duracao
+        setattr(self.alvo, self.atributo, self.inicio + (self.fim - self.inicio) * self.easing(progresso))
+        return progresso >= 1.0
+
+
+class Agendador:
+    def __init__(self):
+        self.ativos = []
+        self.por_chave = {}
+
+    @property
+    def ocupado(self):
+        return bool(self.ativos)
+
+    def _iniciar(self, tween):
+        if tween.chave is not None:
+            anterior = self.por_chave.get(tween.chave)
+            if anterior is not None and anterior is not tween: anterior.cancelar()
+            self.por_chave[tween.chave] = tween
+        self.ativos.append(tween)
+        # Aplica já o valor inicial, para o quadro atual não mostrar o valor antigo
+        setattr(tween.alvo, tween.atributo, tween.inicio)
+        return tween
+
+    def animar(self, alvo, atributo, inicio, fim, duracao_ms, easing=linear, ao_terminar=None, chave=None):
+        return self._iniciar(Tween(self, alvo, atributo, inicio, fim, duracao_ms, easing, ao_terminar, chave))
+
+    def cancelar(self, chave):
+        tween = self.por_chave.pop(chave, None)
+        if tween is not None: tween.cancelar()
+
+    def atualizar(self, dt_ms):
+        ativos, self.ativos = self.ativos, []
+        for tween in ativos:
+            if tween.cancelado: continue
+            if not tween.avancar(dt_ms):
+                self.ativos.append(tween)
+                continue
+            if tween.chave is not None and self.por_chave.get(tween.chave) is tween:
+                del self.por_chave[tween.chave]
+            if tween.ao_terminar: tween.ao_terminar()
+            for seguinte in tween.seguintes:
+                if not seguinte.cancelado: self._iniciar(seguinte)
+        # Tweens criados durante os callbacks já foram acrescentados a self.ativos
@@ -0,0 +1,126 @@
+"""Efeitos sonoros: PCM já descodificado em cache, canais reservados e volume por quadro.
+
+- A primeira vez que um MP3 é carregado, o PCM descodificado é gravado em `pasta_cache`; o
+  nome do ficheiro leva o hash do MP3 e o formato do mixer, por isso trocar o som (ou o
+  mixer) invalida a entrada sozinho. Nos arranques seguintes não há descodificação.
+- Com o pacote de assets (pacote_assets.py), o PCM já vem descodificado no formato do
+  mixer usado no build; o cache só serve quando o mixer do jogo abriu noutro formato.
+- Os efeitos tocam num conjunto de canais reservados (o Pygame não os usa para mais nada).
+  Com todos ocupados, o som novo rouba o canal do som de menor prioridade — entre iguais,
+  o mais antigo; se todos forem mais prioritários, o som novo não toca.
+- Mudar o volume só guarda o valor; `aplicar_volumes()`, chamado uma vez por quadro, é que
+  fala com o mixer, e só quando algo mudou.
+
+Um som novo é uma linha: `audio.registrar("nivel", "nivel.mp3", prioridade=2)`.
+"""
+import hashlib
+import io
+import os
+import time
+
+import pygame
+
+CANAIS_RESERVADOS = 4
+PASTA_CACHE = ".cache_audio"
+
+
+class EfeitoSonoro:
+    __slots__ = ("caminho", "prioridade", "volume", "som")
+
+    def __init__(self, caminho, prioridade, volume):
+        self.caminho, self.prioridade, self.volume, self.som = caminho, prioridade, volume, None
+
+
+class SistemaAudio:
+    def __init__(self, canais=CANAIS_RESERVADOS, pasta_cache=PASTA_CACHE):
+        self.pasta_cache = pasta_cache
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), canais))
+        pygame.mixer.set_reserved(canais)
+        self.canais = [pygame.mixer.Channel(i) for i in range(canais)]
+        self.no_canal = [None] * canais   # (prioridade, início) do que cada canal está a tocar
+        self.efeitos = {}
+        self.volume_sfx, self.volume_musica = 1.0, 1.0
+        self.volumes_aplicados = (None, None)
+
+    # --- Registo e carregamento ---
+    def registrar(self, nome, caminho, prioridade=1, volume=1.0):
+        """Declara um efeito; o som só é carregado por `carregar(nome)` (ex.: na thread de assets)."""
+        self.efeitos[nome] = EfeitoSonoro(caminho, prioridade, volume)
+
+    def carregar(self, nome, pacote=None):
+        """Devolve o Sound do efeito, do pacote de assets ou do cache de PCM se possível.
+
+        Pode correr fora da thread principal.
+        """
+        efeito = self.efeitos[nome]
+        formato = pygame.mixer.get_init()
+        arquivo = os.path.basename(efeito.caminho)
+        if pacote and arquivo in pacote:
+            pcm = pacote.pcm(arquivo, formato)
+            if pcm is not None: return pygame.mixer.Sound(buffer=pcm)
+            dados = pacote.bytes(arquivo)
+        else:
+            with open(efeito.caminho, 'rb') as f: dados = f.read()
+        frequencia, tamanho, canais = formato
+        assinatura = hashlib.blake2b(dados, digest_size=8).hexdigest()
+        base = os.path.splitext(os.path.basename(efeito.caminho))[0]
+        arquivo_pcm = os.path.join(self.pasta_cache, f"{base}.{assinatura}.{frequencia}_{tamanho}_{canais}.pcm")
+        try:
+            with open(arquivo_pcm, 'rb') as f: return pygame.mixer.Sound(buffer=f.read())
+        except OSError:
+            pass
+        som = pygame.mixer.Sound(io.BytesIO(dados))
+        self._guardar_pcm(base, arquivo_pcm, som.get_raw())
+        return som
+
+    def _guardar_pcm(self, base, arquivo_pcm, pcm):
+        try:
+            os.makedirs(self.pasta_cache, exist_ok=True)
+            for antigo in os.listdir(self.pasta_cache):  # versões anteriores do mesmo som
+                if antigo.startswith(base + ".") and antigo.endswith(".pcm"):
+                    os.remove(os.path.join(self.pasta_cache, antigo))
+            temporario = arquivo_pcm + ".tmp"
+            with open(temporario, 'wb') as f: f.write(pcm)
+            os.replace(temporario, arquivo_pcm)
+        except OSError as e:
+            print(f"Aviso: cache de áudio indisponível ({e}).")
+
+    def instalar(self, nome, som):
+        """Chamado na thread principal quando o som carregado chega."""
+        efeito = self.efeitos[nome]
+        efeito.som = som
+        som.set_volume(efeito.volume * self.volume_sfx)
+
+    # --- Reprodução ---
+    def tocar(self, nome):
+        efeito = self.efeitos.get(nome)
+        if efeito is None or efeito.som is None: return
+        indice = self._escolher_canal(efeito.prioridade)
+        if indice is None: return
+        self.canais[indice].play(efeito.som)
+        self.no_canal[indice] = (efeito.prioridade, time.perf_counter())
+
+    def _escolher_canal(self, prioridade):
+        vitima, chave_vitima = None, None
+        for indice, canal in enumerate(self.canais):
+            if not canal.get_busy(): return indice
+            chave = self.no_canal[indice] or (0, 0.0)
+            if chave[0] <= prioridade and (chave_vitima is None or chave < chave_vitima):
+                vitima, chave_vitima = indice, chave
+        return vitima
+
+    def tocar_musica(self, dados):
+        pygame.mixer.music.load(io.BytesIO(dados))
+        pygame.mixer.music.set_volume(self.volume_musica)
+        pygame.mixer.music.play(-1)
+
+    # --- Volume ---
+    def aplicar_volumes(self):
+        """Uma vez por quadro: passa ao mixer os volumes que mudaram desde o último quadro."""
+        volume_sfx_aplicado, volume_musica_aplicado = self.volumes_aplicados
+        if self.volume_musica != volume_musica_aplicado:
+            pygame.mixer.music.set_volume(self.volume_musica)
+        if self.volume_sfx != volume_sfx_aplicado:
+            for efeito in self.efeitos.values():
+                if efeito.som: efeito.som.set_volume(efeito.volume * self.volume_sfx)
+        self.volumes_aplicados = (self.volume_sfx, self.volume_musica)
@@ -0,0 +1,286 @@
+"""Baralhos de cartas (rótulo -> número) com sorteio ponderado em O(log n).
+
+Os pesos ficam numa árvore de Fenwick: sortear, mudar o peso de uma carta e somar os pesos
+de um prefixo (as cartas liberadas no nível atual) custam O(log n), o que mantém cada
+operação abaixo de um milissegundo mesmo com 100 mil cartas. As cartas do histórico recente
+ficam com peso 0 e as erradas na partida pesam mais (repetição espaçada).
+
+As cópias de um baralho (uma por sessão no servidor.py) partilham as cartas e a árvore dos
+pesos iniciais; cada uma só guarda, em dicionários, o que mudou na sua partida.
+
+    python baralho.py --cartas 100000 --sorteios 100000   # micro-benchmark
+    python baralho.py --verificar                         # confere com um sorteio por força bruta
+"""
+import argparse
+import random
+import time
+from collections import deque
+
+TAMANHO_HISTORICO = 5  # cartas recentes que não voltam a sair
+PESO_BASE = 4
+BONUS_POR_ERRO = 8   # peso extra por cada erro ainda "em dívida" na carta
+MAXIMO_ERROS = 4     # teto da dívida, para uma carta não dominar o sorteio
+
+
+class ArvoreFenwick:
+    """Somas de prefixo e busca por soma acumulada sobre pesos inteiros (exatos, sem deriva).
+
+    Os pesos iniciais e a sua árvore (`pesos_base`, `base`) nunca mudam e são partilhados pelas
+    cópias; as alterações ficam em `pesos` (índice -> peso) e `ajustes` (nó -> diferença para a
+    base). Uma cópia que mudou k pesos ocupa O(k log n), seja qual for o tamanho do baralho.
+    """
+    __slots__ = ("n", "pesos_base", "base", "pesos", "ajustes", "passo_inicial")
+
+    def __init__(self, pesos):
+        self.n = len(pesos)
+        self.pesos_base = list(pesos)
+        self.base = [0] + self.pesos_base
+        for i in range(1, self.n + 1):  # construção em O(n)
+            pai = i + (i & -i)
+            if pai <= self.n: self.base[pai] += self.base[i]
+        self.passo_inicial = 1 << self.n.bit_length() if self.n else 0
+        self.pesos, self.ajustes = {}, {}
+
+    def copia_limpa(self):
+        """Outra árvore sobre a mesma base, com os pesos iniciais."""
+        copia = ArvoreFenwick.__new__(ArvoreFenwick)
+        copia.n, copia.pesos_base, copia.base, copia.passo_inicial = self.n, self.pesos_base, self.base, self.passo_inicial
+        copia.pesos, copia.ajustes = {}, {}
+        return copia
+
+    def limpar(self):
+        """Volta aos pesos iniciais."""
+        self.pesos.clear(); self.ajustes.clear()
+
+    def peso(self, indice):
+        return self.pesos.get(indice, self.pesos_base[indice])
+
+    def definir(self, indice, peso):
+        delta = peso - self.peso(indice)
+        if not delta: return
+        if peso == self.pesos_base[indice]: del self.pesos[indice]
+        else: self.pesos[indice] = peso
+        ajustes, i = self.ajustes, indice + 1
+        while i <= self.n:
+            ajuste = ajustes.get(i, 0) + delta
+            if ajuste: ajustes[i] = ajuste
+            else: del ajustes[i]  # o nó voltou ao valor da base
+            i += i & -i
+
+    def soma(self, quantidade):
+        """Soma dos pesos das `quantidade` primeiras posições."""
+        base, ajustes = self.base, self.ajustes
+        total, i = 0, quantidade
+        while i > 0:
+            total += base[i] + ajustes.get(i, 0)
+            i -= i & -i
+        return total
+
+    def procurar(self, alvo):
+        """Menor índice cuja soma acumulada (inclusive) passa de `alvo`, com 0 <= alvo < total."""
+        base, ajustes = self.base, self.ajustes
+        posicao, passo = 0, self.passo_inicial
+        while passo:
+            seguinte = posicao + passo
+            if seguinte <= self.n:
+                valor = base[seguinte] + ajustes.get(seguinte, 0)
+                if valor <= alvo:
+                    posicao = seguinte
+                    alvo -= valor
+            passo >>= 1
+        return posicao
+
+
+class Baralho:
+    """Cartas (rótulo, resposta) sorteadas por peso, sem repetir as do histórico recente.
+
+    A ordem das cartas importa: cada nível libera um prefixo do baralho (as mais fáceis primeiro).
+    """
+    __slots__ = ("rotulos", "respostas", "erros", "historico", "no_historico", "arvore")
+
+    def __init__(self, cartas, tamanho_historico=TAMANHO_HISTORICO):
+        self.rotulos = [rotulo for rotulo, _ in cartas]
+        self.respostas = [resposta for _, resposta in cartas]
+        self.erros = {}  # índice -> erros em dívida, só das cartas com dívida
+        self.historico = deque(maxlen=tamanho_historico)
+        self.no_historico = {}  # índice -> vezes que aparece no histórico
+        self.arvore = ArvoreFenwick([PESO_BASE] * len(cartas))
+
+    def __len__(self):
+        return len(self.rotulos)
+
+    def copia_limpa(self):
+        """Outro baralho com as mesmas cartas e a mesma árvore base (partilhadas), sem histórico nem erros."""
+        copia = Baralho.__new__(Baralho)
+        copia.rotulos, copia.respostas = self.rotulos, self.respostas
+        copia.erros = {}
+        copia.historico = deque(maxlen=self.historico.maxlen)
+        copia.no_historico = {}
+        copia.arvore = self.arvore.copia_limpa()
+        return copia
+
+    def reiniciar(self):
+        self.erros.clear(); self.arvore.limpar()
+        self.historico.clear(); self.no_historico.clear()
+
+    def peso(self, indice):
+        if indice in self.no_historico: return 0
+        return PESO_BASE + BONUS_POR_ERRO * self.erros.get(indice, 0)
+
+    def sortear(self, limite, rng):
+        """Índice de uma carta entre as `limite` primeiras; se todas estão no histórico, qualquer uma delas."""
+        total = self.arvore.soma(limite)
+        indice = self.arvore.procurar(rng.randrange(total)) if total else rng.randrange(limite)
+        if len(self.historico) == self.historico.maxlen:
+            self._sair_do_historico(self.historico[0])
+        self.historico.append(indice)
+        self.no_historico[indice] = self.no_historico.get(indice, 0) + 1
+        self.arvore.definir(indice, 0)
+        return indice
+
+    def _sair_do_historico(self, indice):
+        restantes = self.no_historico[indice] - 1
+        if restantes: self.no_historico[indice] = restantes
+        else:
+            del self.no_historico[indice]
+            self.arvore.definir(indice, self.peso(indice))
+
+    def registrar_resposta(self, indice, correta):
+        """Erros aumentam o peso da carta; cada acerto paga metade da dívida."""
+        erros = self.erros.get(indice, 0)
+        erros = erros // 2 if correta else min(MAXIMO_ERROS, erros + 1)
+        if erros: self.erros[indice] = erros
+        else: self.erros.pop(indice, None)
+        self.arvore.definir(indice, self.peso(indice))
+
+
+# --- Baralhos gerados e ficheiros ---
+def codigo_coluna(numero):
+    """1 -> A, 26 -> Z, 27 -> AA, 28 -> AB... (como as colunas de uma folha de cálculo)."""
+    codigo = ""
+    while numero:
+        numero, resto = divmod(numero - 1, 26)
+        codigo = chr(ord('A') + resto) + codigo
+    return codigo
+
+
+def baralho_colunas(quantidade):
+    """Códigos de várias letras e a sua posição: A=1 ... Z=26, AA=27 ..."""
+    return Baralho([(codigo_coluna(n), n) for n in range(1, quantidade + 1)])
+
+
+def carregar_baralho(caminho):
+    """Uma carta por linha, `rótulo;resposta` (também aceita vírgula ou tab); `#` começa um comentário."""
+    cartas = []
+    with open(caminho, encoding="utf-8") as f:
+        for numero_linha, linha in enumerate(f, 1):
+            linha = linha.split("#", 1)[0].strip()
+            if not linha: continue
+            separador = next((s for s in (";", "\t", ",") if s in linha), None)
+            rotulo, _, resposta = linha.rpartition(separador) if separador else ("", "", linha)
+            try:
+                if not rotulo.strip(): raise ValueError
+                cartas.append((rotulo.strip(), int(resposta)))
+            except ValueError:
+                raise ValueError(f"{caminho}:{numero_linha}: esperado 'rótulo;número', encontrado {linha!r}") from None
+    if not cartas: raise ValueError(f"{caminho}: baralho vazio")
+    return Baralho(cartas)
+
+
+# --- Verificação ---
+def sortear_forca_bruta(pesos, limite, rng):
+    """O mesmo sorteio que Baralho.sortear, percorrendo a lista de pesos."""
+    total = sum(pesos[:limite])
+    if not total: return rng.randrange(limite)
+    alvo = rng.randrange(total)
+    for indice in range(limite):
+        alvo -= pesos[indice]
+        if alvo < 0: return indice
+
+
+def verificar(cartas, operacoes, semente=0):
+    """Joga o baralho (e uma cópia limpa dele) ao lado de um modelo que recalcula cada peso do
+    zero; com o mesmo gerador, cada sorteio e cada peso têm de coincidir. Devolve os sorteios feitos."""
+    rng = random.Random(semente)
+    original = baralho_colunas(cartas)
+    conferidos = 0
+    for baralho in (original, original.copia_limpa()):  # a cópia parte da base já usada pelo original
+        erros, historico = [0] * cartas, deque(maxlen=TAMANHO_HISTORICO)
+        for operacao in range(operacoes):
+            if operacao % 500 == 499:
+                baralho.reiniciar(); erros, historico = [0] * cartas, deque(maxlen=TAMANHO_HISTORICO)
+            pesos = [0 if i in historico else PESO_BASE + BONUS_POR_ERRO * erros[i] for i in range(cartas)]
+            for i in range(cartas):
+                if baralho.arvore.peso(i) != pesos[i]: raise AssertionError(f"carta {i}: peso {baralho.arvore.peso(i)}, esperado {pesos[i]}")
+            limite = rng.randint(1, cartas)
+            semente_sorteio = rng.random()
+            indice = baralho.sortear(limite, random.Random(semente_sorteio))
+            esperado = sortear_forca_bruta(pesos, limite, random.Random(semente_sorteio))
+            if indice != esperado: raise AssertionError(f"sorteio {operacao}: carta {indice}, esperada {esperado}")
+            historico.append(indice)
+            correta = rng.random() < 0.6
+            baralho.registrar_resposta(indice, correta)
+            erros[indice] = erros[indice] // 2 if correta else min(MAXIMO_ERROS, erros[indice] + 1)
+            conferidos += 1
+    return conferidos
+
+
+# --- Micro-benchmark ---
+def sortear_lista(rotulos, historico, limite, rng):
+    """O sorteio antigo (filtra a lista a cada vez), só para comparação."""
+    disponiveis = rotulos[:limite]
+    pool = [rotulo for rotulo in disponiveis if rotulo not in historico]
+    escolhido = rng.choice(pool or disponiveis)
+    historico.append(escolhido)
+    if len(historico) > TAMANHO_HISTORICO: historico.pop(0)
+    return escolhido
+
+
+def medir(operacao, repeticoes):
+    """Tempos de cada chamada em microssegundos: (média, p99, máximo)."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter_ns()
+        operacao()
+        tempos.append((time.perf_counter_ns() - inicio) / 1000)
+    tempos.sort()
+    return sum(tempos) / len(tempos), tempos[int(0.99 * (len(tempos) - 1))], tempos[-1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmark do sorteio ponderado")
+    parser.add_argument("--cartas", type=int, default=100_000)
+    parser.add_argument("--sorteios", type=int, default=100_000)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--verificar", action="store_true", help="confere sorteios e pesos com um modelo por força bruta")
+    args = parser.parse_args()
+
+    if args.verificar:
+        total = sum(verificar(cartas, 2000, args.semente) for cartas in (1, 2, 5, 26, 100, 1000))
+        print(f"Verificação: {total} sorteios e os pesos de todas as cartas conferem com a força bruta.")
+        raise SystemExit
+
+    rng = random.Random(args.semente)
+    inicio = time.perf_counter()
+    baralho = baralho_colunas(args.cartas)
+    print(f"Baralho de {len(baralho)} cartas criado em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+    limite = len(baralho)
+
+    ultimo = [0]
+    def sortear():
+        ultimo[0] = baralho.sortear(limite, rng)
+    def responder():
+        baralho.registrar_resposta(ultimo[0], rng.random() < 0.8)
+    def sortear_e_responder():
+        sortear(); responder()
+    historico = []
+    def antigo():
+        sortear_lista(baralho.rotulos, historico, limite, rng)
+
+    print(f"{'operação':<28}{'média µs':>10}{'p99 µs':>10}{'máx µs':>10}")
+    for nome, operacao, repeticoes in (("sortear", sortear, args.sorteios),
+                                       ("registrar_resposta", responder, args.sorteios),
+                                       ("sortear + responder", sortear_e_responder, args.sorteios),
+                                       ("lista filtrada (antigo)", antigo, max(1, min(args.sorteios, 200_000_000 // max(1, args.cartas))))):
+        media, p99, maximo = medir(operacao, repeticoes)
+        print(f"{nome:<28}{media:10.2f}{p99:10.2f}{maximo:10.1f}")
@@ -0,0 +1,337 @@
+"""Benchmark de renderização sem janela (SDL_VIDEODRIVER=dummy), por estado e resolução.
+
+Para cada combinação corre `main.py --benchmark ESTADO --tamanho LxA` num processo à parte. O
+RoteiroBenchmark (abaixo) é carregado pelo main.py nesse modo: leva o jogo até ao estado com
+eventos simulados, mantém-no ativo (respostas, partículas, tremor, arrastar de sliders) e mede
+os quadros. Os resultados são gravados em JSON e comparados com uma baseline guardada.
+
+A segunda passagem (sem --sem-memoria) liga o tracemalloc e mede, por quadro, quanta memória
+foi alocada acima do que já existia no início do quadro (o pico, mesmo que seja libertada antes
+do fim) e, comparando um snapshot do início da medição com um do fim, quantos blocos alocados
+nos quadros medidos continuam vivos. Conta objetos Python e arrays NumPy; os píxeis das
+superfícies do SDL não passam pelo alocador do Python e ficam de fora.
+
+Com --verificar-retangulos confere o --retangulos-sujos: com um dt grande forçado em cada
+quadro (as animações andam muito entre dois quadros), cada quadro desenhado por retângulos é
+comparado píxel a píxel com um quadro completo.
+
+Com --latencia mede outra coisa: com o jogo carregado de partículas, uma thread injeta teclas
+em momentos aleatórios e conta quanto tempo cada uma leva até à lógica e até ao ecrã, com o
+desenho na thread principal e com --desenho-em-thread.
+
+    python benchmark.py --gravar-baseline
+    python benchmark.py --baseline benchmark_baseline.json --limite 0.15
+    python benchmark.py --verificar-retangulos --dt 250
+    python benchmark.py --latencia --tamanhos 1920x1080 3840x2160
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import numpy as np
+import pygame
+
+ESTADOS = ("menu", "jogando", "settings", "confirmando_reset", "confirmando_dificuldade", "fim_de_jogo")
+TAMANHOS = ("640x360", "1280x720", "1920x1080", "3840x2160")
+QUADROS_AQUECIMENTO = 30
+FOLGA_ALOCACAO_KB = 1.0  # diferença absoluta ignorada ao comparar alocações (evita 0 -> 0,1 KB)
+FOLGA_BLOCOS = 50        # idem para os blocos retidos (caches que enchem um pouco mais numa corrida)
+ARQUIVO_BASELINE = "benchmark_baseline.json"
+PARTICULAS_LATENCIA = 20_000               # carga mantida durante a medição de latência
+INTERVALO_ENTRADAS_S = (0.010, 0.050)      # entre duas teclas injetadas
+
+
+def _tecla(tecla, unicode="", **atributos):
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=tecla, unicode=unicode, mod=0, scancode=0, **atributos))
+
+
+def _clique(pos):
+    pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=pos))
+
+
+def _responder(jogo, correta):
+    resposta = jogo.partida.numero_correto if correta else jogo.partida.numero_correto + 10
+    for digito in str(resposta): _tecla(0, digito)
+    _tecla(pygame.K_RETURN, "\r")
+
+
+class RoteiroBenchmark:
+    """Entrada simulada e medição, usado pelo main.py quando corre com --benchmark.
+
+    O alvo "latencia" joga no estado "jogando"; aí `quadros` é o número de teclas a medir.
+    """
+
+    def __init__(self, alvo, quadros, medir_memoria=False, dt_forcado=None, verificar=False):
+        self.alvo, self.quadros, self.medir_memoria = alvo, quadros, medir_memoria
+        self.dt_forcado, self.verificar = dt_forcado, verificar
+        self.diferencas = []  # (píxeis diferentes, maior diferença num canal) de cada quadro conferido
+        self.estado_alvo = "jogando" if alvo == "latencia" else alvo
+        self.quadro = 0              # quadros desde o início
+        self.quadros_no_alvo = 0     # quadros seguidos já no estado alvo
+        self.tempos_ms, self.alocado_kb = [], []
+        self.respostas = 0
+        self.inicio_quadro, self.memoria_inicio, self.pico_kb = None, 0, 0.0
+        self.snapshot_inicio = None
+        self.jogo, self.injetor, self.parar_injecao = None, None, threading.Event()
+        self.inicio_injecao, self.quadros_antes_injecao = 0.0, 0
+
+    @property
+    def medindo(self):
+        return self.quadros_no_alvo > QUADROS_AQUECIMENTO
+
+    def antes_do_quadro(self, jogo):
+        self.quadro += 1
+        self.jogo = jogo
+        if self.dt_forcado: jogo.dt_ms = self.dt_forcado
+        estado = jogo.estado_jogo
+        self.quadros_no_alvo = self.quadros_no_alvo + 1 if estado == self.estado_alvo else 0
+        if self.quadros_no_alvo == QUADROS_AQUECIMENTO + 1 and self.medir_memoria:
+            tracemalloc.start()
+            self.snapshot_inicio = _snapshot()
+        if self.alvo == "latencia" and self.medindo: self._carregar_e_injetar(jogo)
+        if self.quadro % 6 == 0: self._conduzir(jogo, estado)
+        if self.medindo:
+            if tracemalloc.is_tracing():
+                self.memoria_inicio = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+            self.inicio_quadro = time.perf_counter()
+
+    def _conduzir(self, jogo, estado):
+        """Empurra o jogo para o estado alvo e, lá chegado, mantém-no a trabalhar."""
+        if estado == "menu":
+            if self.alvo == "settings": _clique(jogo.settings_button_menu_rect.center)
+            elif self.alvo != "menu": _tecla(pygame.K_SPACE, " ")
+        elif estado == "fim_de_jogo":
+            if self.alvo != "fim_de_jogo": _tecla(pygame.K_SPACE, " ")
+        elif estado == "confirmando_dificuldade":
+            if self.alvo != estado: _tecla(pygame.K_s, "s")
+        elif estado == "confirmando_reset":
+            if self.alvo != estado: _tecla(pygame.K_n, "n")
+        elif estado == "settings":
+            if self.alvo != estado: _tecla(pygame.K_ESCAPE)
+            elif not jogo.dragging_music_handle:
+                _clique(jogo.area_puxador(jogo.music_slider_rect, jogo.music_handle_rect, jogo.volume_musica).center)
+            else:
+                slider = jogo.music_slider_rect
+                x = slider.left + (self.quadro * 7) % slider.width
+                pygame.event.post(pygame.event.Event(pygame.MOUSEMOTION, pos=(x, slider.centery), rel=(7, 0), buttons=(1, 0, 0)))
+        elif estado == "jogando":
+            if self.alvo == "latencia": return  # aqui só entram as teclas do injetor
+            if self.alvo == "confirmando_reset":
+                _clique(jogo.reset_button_rect.center)
+            elif self.alvo == "fim_de_jogo":
+                _responder(jogo, correta=False)
+            elif self.quadro % 12 == 0:
+                # Um erro a cada quatro respostas para haver tremor; as vidas são repostas
+                # para a partida não acabar durante a medição
+                correta = self.alvo == "confirmando_dificuldade" or self.respostas % 4 != 3
+                _responder(jogo, correta)
+                if not correta: jogo.partida.vidas = 3
+                self.respostas += 1
+
+    def _carregar_e_injetar(self, jogo):
+        """Mantém as partículas no máximo e, da primeira vez, começa a injetar teclas."""
+        falta = PARTICULAS_LATENCIA - len(jogo.particulas)
+        if falta > 0: jogo.particulas.emitir(jogo.LARGURA_TELA / 2, jogo.ALTURA_TELA / 3, falta)
+        if self.injetor is None:
+            jogo.latencia_logica.limpar(); jogo.latencia_ecra.limpar()
+            self.inicio_injecao, self.quadros_antes_injecao = time.perf_counter(), jogo.quadros_apresentados
+            self.injetor = threading.Thread(target=self._injetar, name="injetor", daemon=True)
+            self.injetor.start()
+
+    def _injetar(self):
+        """Teclas que chegam a qualquer momento, como as de uma pessoa, e não só entre quadros.
+
+        Cada evento leva o `momento` em que foi injetado. Dígito e apagar alternam: o número no
+        ecrã muda a cada tecla e a resposta nunca é enviada.
+        """
+        rng = random.Random(0)
+        for i in range(self.quadros):
+            if self.parar_injecao.wait(rng.uniform(*INTERVALO_ENTRADAS_S)): return
+            if i % 2: _tecla(pygame.K_BACKSPACE, momento=time.perf_counter())
+            else: _tecla(pygame.K_7, "7", momento=time.perf_counter())
+
+    def _conferir_quadro(self, jogo):
+        """Compara o ecrã (desenhado por retângulos) com o mesmo quadro desenhado por inteiro."""
+        completo = pygame.Surface(jogo.tela.get_size(), 0, jogo.tela)
+        jogo.desenhar_quadro_completo(completo, jogo.foto)
+        diferenca = np.abs(pygame.surfarray.array3d(jogo.tela).astype(np.int16) - pygame.surfarray.array3d(completo))
+        self.diferencas.append((int(np.count_nonzero(diferenca.max(axis=2))), int(diferenca.max())))
+
+    def depois_do_quadro(self):
+        """Regista o quadro; devolve True quando já foram medidos quadros suficientes."""
+        # Os quadros com tremor não passam pelo renderizador (e o deslocamento é sorteado)
+        jogo = self.jogo
+        if self.verificar and self.medindo and jogo.renderizador and not round(jogo.foto.tremor): self._conferir_quadro(jogo)
+        if self.medindo and self.inicio_quadro is not None:
+            self.tempos_ms.append((time.perf_counter() - self.inicio_quadro) * 1000)
+            if tracemalloc.is_tracing():
+                pico = tracemalloc.get_traced_memory()[1]
+                self.alocado_kb.append((pico - self.memoria_inicio) / 1024)
+                self.pico_kb = max(self.pico_kb, pico / 1024)
+        if self.alvo == "latencia":
+            if self.jogo is None or self.jogo.latencia_ecra.total < self.quadros: return False
+            self.parar_injecao.set()
+            return True
+        return len(self.tempos_ms) >= self.quadros
+
+    def gravar(self, caminho, tamanho):
+        tempos = sorted(self.tempos_ms) or [0.0]
+        percentil = lambda p: tempos[min(len(tempos) - 1, round(p / 100 * (len(tempos) - 1)))]
+        resultado = {
+            "estado": self.alvo, "tamanho": f"{tamanho[0]}x{tamanho[1]}", "quadros": len(self.tempos_ms),
+            "fps": 1000 * len(self.tempos_ms) / sum(self.tempos_ms) if self.tempos_ms else 0.0,
+            "quadro_ms": {"p50": percentil(50), "p95": percentil(95), "p99": percentil(99)},
+        }
+        if self.verificar:
+            resultado["quadros_conferidos"] = len(self.diferencas)
+            resultado["quadros_diferentes"] = sum(1 for pixeis, _ in self.diferencas if pixeis)
+            resultado["pixeis_diferentes_max"] = max((pixeis for pixeis, _ in self.diferencas), default=0)
+            resultado["diferenca_canal_max"] = max((maior for _, maior in self.diferencas), default=0)
+        if self.alvo == "latencia":
+            duracao = time.perf_counter() - self.inicio_injecao
+            resultado["quadros_por_s"] = (self.jogo.quadros_apresentados - self.quadros_antes_injecao) / duracao
+            for chave, contador in (("latencia_logica_ms", self.jogo.latencia_logica), ("latencia_ecra_ms", self.jogo.latencia_ecra)):
+                resultado[chave] = dict(zip(("p50", "p95", "p99"), contador.percentis()))
+        if self.medir_memoria and tracemalloc.is_tracing():
+            # O pico é reposto a cada quadro: o da medição inteira é o maior dos quadros
+            resultado["pico_tracemalloc_kb"] = self.pico_kb
+            resultado["alocado_por_quadro_kb"] = sum(self.alocado_kb) / max(1, len(self.alocado_kb))
+            diferencas = _snapshot().compare_to(self.snapshot_inicio, "filename")
+            resultado["blocos_retidos"] = sum(d.count_diff for d in diferencas)
+            resultado["blocos_retidos_por_arquivo"] = {
+                d.traceback[0].filename: d.count_diff for d in diferencas[:5] if d.count_diff}
+            tracemalloc.stop()
+        if resource:
+            # ru_maxrss vem em KB no Linux e em bytes no macOS
+            pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            resultado["pico_rss_kb"] = pico / 1024 if sys.platform == "darwin" else pico
+        with open(caminho, 'w') as f: json.dump(resultado, f)
+
+
+def _snapshot():
+    """Snapshot do tracemalloc sem os blocos do próprio benchmark (as listas de tempos crescem a cada quadro)."""
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, __file__), tracemalloc.Filter(False, tracemalloc.__file__)))
+
+
+# --- Orquestração ---
+def correr(estado, tamanho, quadros, medir_memoria, opcoes=()):
+    pasta = os.path.dirname(os.path.abspath(__file__))
+    ambiente = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    with tempfile.TemporaryDirectory() as temporaria:
+        saida = os.path.join(temporaria, "resultado.json")
+        comando = [sys.executable, os.path.join(pasta, "main.py"), "--benchmark", estado, "--tamanho", tamanho,
+                   "--benchmark-quadros", str(quadros), "--benchmark-saida", saida]
+        if medir_memoria: comando.append("--benchmark-memoria")
+        comando += opcoes
+        subprocess.run(comando, cwd=pasta, env=ambiente, check=True, stdout=subprocess.DEVNULL)
+        with open(saida) as f: return json.load(f)
+
+
+def comparar(resultados, baseline, limite):
+    """Lista de regressões: FPS abaixo, ou memória e alocação por quadro acima da baseline, por mais que `limite`."""
+    anteriores = {(r["estado"], r["tamanho"]): r for r in baseline}
+    regressoes = []
+    for r in resultados:
+        base = anteriores.get((r["estado"], r["tamanho"]))
+        if not base: continue
+        if r["fps"] < base["fps"] * (1 - limite):
+            regressoes.append(f"{r['estado']} {r['tamanho']}: FPS {base['fps']:.1f} -> {r['fps']:.1f}")
+        for chave in ("pico_tracemalloc_kb", "pico_rss_kb"):
+            if chave in r and chave in base and r[chave] > base[chave] * (1 + limite):
+                regressoes.append(f"{r['estado']} {r['tamanho']}: {chave} {base[chave]:.0f} -> {r[chave]:.0f}")
+        for chave, folga in (("alocado_por_quadro_kb", FOLGA_ALOCACAO_KB), ("blocos_retidos", FOLGA_BLOCOS)):
+            if chave in r and chave in base and r[chave] > base[chave] * (1 + limite) + folga:
+                regressoes.append(f"{r['estado']} {r['tamanho']}: {chave} {base[chave]:.1f} -> {r[chave]:.1f}")
+    return regressoes
+
+
+def verificar_retangulos(estados, tamanhos, quadros, dt_ms):
+    """Cada estado com --retangulos-sujos e dt forçado; devolve True se todos os quadros conferem."""
+    print(f"{'estado':<24}{'tamanho':>10}{'conferidos':>12}{'diferentes':>12}{'píxeis máx':>12}{'canal máx':>11}")
+    certo = True
+    for estado in estados:
+        for tamanho in tamanhos:
+            r = correr(estado, tamanho, quadros, False,
+                       ("--retangulos-sujos", "--benchmark-dt", str(dt_ms), "--benchmark-verificar"))
+            certo = certo and not r["quadros_diferentes"]
+            print(f"{estado:<24}{tamanho:>10}{r['quadros_conferidos']:12}{r['quadros_diferentes']:12}"
+                  f"{r['pixeis_diferentes_max']:12}{r['diferenca_canal_max']:11}")
+    return certo
+
+
+def medir_latencia(tamanhos, teclas):
+    """Cada tamanho com o desenho na thread principal e numa thread à parte."""
+    resultados = []
+    print(f"{'tamanho':<11}{'desenho':<12}{'quadros/s':>10}{'lógica p50':>12}{'p99':>8}{'ecrã p50':>10}{'p99':>8}")
+    for tamanho in tamanhos:
+        for desenho, opcoes in (("principal", ()), ("em thread", ("--desenho-em-thread",))):
+            resultado = correr("latencia", tamanho, teclas, False, opcoes)
+            resultado["desenho"] = desenho
+            resultados.append(resultado)
+            logica, ecra = resultado["latencia_logica_ms"], resultado["latencia_ecra_ms"]
+            print(f"{tamanho:<11}{desenho:<12}{resultado['quadros_por_s']:10.1f}{logica['p50']:12.2f}{logica['p99']:8.2f}"
+                  f"{ecra['p50']:10.2f}{ecra['p99']:8.2f}")
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de renderização do Adivinhe o Número da Letra")
+    parser.add_argument("--estados", nargs="+", choices=ESTADOS, default=ESTADOS)
+    parser.add_argument("--tamanhos", nargs="+", default=TAMANHOS)
+    parser.add_argument("--quadros", type=int, default=300)
+    parser.add_argument("--sem-memoria", action="store_true", help="não faz a segunda passagem com tracemalloc")
+    parser.add_argument("--saida", default="benchmark_resultados.json")
+    parser.add_argument("--baseline", help="falha se houver regressão em relação a este ficheiro")
+    parser.add_argument("--limite", type=float, default=0.10, help="regressão tolerada (fração, padrão 0.10)")
+    parser.add_argument("--gravar-baseline", action="store_true", help=f"grava os resultados em {ARQUIVO_BASELINE}")
+    parser.add_argument("--latencia", action="store_true",
+                        help="latência das teclas sob carga, com e sem --desenho-em-thread (--quadros = teclas)")
+    parser.add_argument("--verificar-retangulos", action="store_true",
+                        help="confere o desenho por retângulos sujos com quadros completos, com dt forçado")
+    parser.add_argument("--dt", type=int, default=250, help="dt (ms) forçado em cada quadro com --verificar-retangulos")
+    args = parser.parse_args()
+
+    if args.verificar_retangulos:
+        sys.exit(0 if verificar_retangulos(args.estados, args.tamanhos, args.quadros, args.dt) else 1)
+    if args.latencia:
+        with open(args.saida, 'w') as f: json.dump(medir_latencia(args.tamanhos, args.quadros), f, indent=2)
+        sys.exit(0)
+
+    resultados = []
+    print(f"{'estado':<24}{'tamanho':>10}{'fps':>9}{'p50 ms':>9}{'p95 ms':>9}{'KB/quadro':>11}{'tracemalloc KB':>16}"
+          f"{'blocos retidos':>16}")
+    for estado in args.estados:
+        for tamanho in args.tamanhos:
+            resultado = correr(estado, tamanho, args.quadros, False)
+            if not args.sem_memoria:
+                memoria = correr(estado, tamanho, args.quadros, True)
+                resultado["alocado_por_quadro_kb"] = memoria["alocado_por_quadro_kb"]
+                resultado["pico_tracemalloc_kb"] = memoria["pico_tracemalloc_kb"]
+                resultado["blocos_retidos"] = memoria["blocos_retidos"]
+                resultado["blocos_retidos_por_arquivo"] = memoria["blocos_retidos_por_arquivo"]
+            resultados.append(resultado)
+            print(f"{estado:<24}{tamanho:>10}{resultado['fps']:9.1f}{resultado['quadro_ms']['p50']:9.2f}"
+                  f"{resultado['quadro_ms']['p95']:9.2f}{resultado.get('alocado_por_quadro_kb', 0):11.1f}"
+                  f"{resultado.get('pico_tracemalloc_kb', 0):16.0f}{resultado.get('blocos_retidos', 0):16}")
+
+    with open(args.saida, 'w') as f: json.dump(resultados, f, indent=2)
+    if args.gravar_baseline:
+        with open(ARQUIVO_BASELINE, 'w') as f: json.dump(resultados, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f: regressoes = comparar(resultados, json.load(f), args.limite)
+        for regressao in regressoes: print("REGRESSÃO:", regressao)
+        sys.exit(1 if regressoes else 0)
@@ -0,0 +1,124 @@
+"""Gerador de carga para o servidor.py: milhares de jogadores simulados em paralelo.
+
+Cada cliente é uma ligação que pede uma partida, "pensa" um tempo aleatório, responde (certo
+com a probabilidade --precisao) e recomeça quando perde. Mede respostas por segundo e a
+latência de ida e volta de cada pedido. Os clientes são repartidos por vários processos
+para o gerador não ser o gargalo.
+
+    python servidor.py &
+    python carga.py --clientes 10000 --segundos 30 --pensar 1.0
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from logica import LETRAS_NUMEROS
+from servidor import PORTA_PADRAO, aumentar_limite_ficheiros
+
+LIGACOES_SIMULTANEAS = 256  # ligações a abrir ao mesmo tempo durante o arranque
+
+
+class ClienteCarga(asyncio.Protocol):
+    __slots__ = ("medicao", "rng", "transporte", "pendente", "enviado_em")
+
+    def __init__(self, medicao, rng):
+        self.medicao, self.rng = medicao, rng
+        self.transporte, self.pendente, self.enviado_em = None, b"", 0.0
+
+    def connection_made(self, transporte):
+        self.transporte = transporte
+        self.enviar(b"N\n")
+
+    def connection_lost(self, excecao):
+        self.medicao.perdidas += not self.medicao.terminado
+
+    def enviar(self, pedido):
+        if self.medicao.terminado or self.transporte.is_closing(): return
+        self.enviado_em = time.perf_counter()
+        self.transporte.write(pedido)
+
+    def data_received(self, dados):
+        linhas = (self.pendente + dados).split(b"\n")
+        self.pendente = linhas.pop()
+        for linha in linhas: self.receber(linha.decode())
+
+    def receber(self, linha):
+        medicao = self.medicao
+        medicao.latencias_ms.append((time.perf_counter() - self.enviado_em) * 1000)
+        campos = linha.split(" ")
+        if campos[0] == "X":
+            medicao.erros += 1; return
+        if campos[0] != "L": medicao.respostas += 1
+        letra = campos[-1]
+        if not letra:  # acabou a partida
+            self.enviar(b"N\n"); return
+        resposta = LETRAS_NUMEROS.get(letra, 0)
+        if self.rng.random() >= medicao.precisao: resposta += 1
+        pedido = f"R {resposta}\n".encode()
+        asyncio.get_running_loop().call_later(self.rng.uniform(0, 2 * medicao.pensar), self.enviar, pedido)
+
+
+class Medicao:
+    def __init__(self, precisao, pensar):
+        self.precisao, self.pensar = precisao, pensar
+        self.latencias_ms, self.respostas, self.erros, self.perdidas = [], 0, 0, 0
+        self.terminado = False
+
+
+async def correr_clientes(endereco, clientes, segundos, precisao, pensar, semente):
+    loop = asyncio.get_running_loop()
+    medicao, rng = Medicao(precisao, pensar), random.Random(semente)
+    host, _, porta = endereco.rpartition(":")
+    limite = asyncio.Semaphore(LIGACOES_SIMULTANEAS)
+
+    async def ligar():
+        async with limite:
+            fabrica = lambda: ClienteCarga(medicao, rng)
+            if porta.isdigit(): return (await loop.create_connection(fabrica, host or "127.0.0.1", int(porta)))[0]
+            return (await loop.create_unix_connection(fabrica, endereco))[0]
+
+    inicio = time.perf_counter()
+    resultados = await asyncio.gather(*(ligar() for _ in range(clientes)), return_exceptions=True)
+    transportes = [r for r in resultados if not isinstance(r, BaseException)]
+    arranque = time.perf_counter() - inicio
+    # Só conta o regime estável, depois de todas as ligações abertas
+    medicao.latencias_ms.clear(); medicao.respostas = 0
+    await asyncio.sleep(segundos)
+    medicao.terminado = True
+    for transporte in transportes: transporte.close()
+    return {"ligadas": len(transportes), "falhadas": clientes - len(transportes), "arranque_s": arranque,
+            "respostas": medicao.respostas, "erros": medicao.erros, "perdidas": medicao.perdidas,
+            "latencias_ms": medicao.latencias_ms}
+
+
+def _processo(parametros):
+    aumentar_limite_ficheiros()
+    return asyncio.run(correr_clientes(*parametros))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gerador de carga para o servidor de partidas")
+    parser.add_argument("--endereco", default=f"127.0.0.1:{PORTA_PADRAO}", help="host:porta ou caminho de socket Unix")
+    parser.add_argument("--clientes", type=int, default=10_000)
+    parser.add_argument("--segundos", type=float, default=30)
+    parser.add_argument("--pensar", type=float, default=1.0, help="tempo médio (s) até cada resposta")
+    parser.add_argument("--precisao", type=float, default=0.9)
+    parser.add_argument("--processos", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    partes = [args.clientes // args.processos + (i < args.clientes % args.processos) for i in range(args.processos)]
+    tarefas = [(args.endereco, n, args.segundos, args.precisao, args.pensar, args.semente + i) for i, n in enumerate(partes) if n]
+    with ProcessPoolExecutor(len(tarefas)) as pool:
+        resultados = list(pool.map(_processo, tarefas))
+
+    latencias = sorted(l for r in resultados for l in r["latencias_ms"])
+    percentil = lambda p: latencias[min(len(latencias) - 1, round(p / 100 * (len(latencias) - 1)))] if latencias else 0.0
+    total = lambda chave: sum(r[chave] for r in resultados)
+    print(f"Ligações: {total('ligadas')} abertas, {total('falhadas')} falhadas, {total('perdidas')} perdidas "
+          f"(arranque {max(r['arranque_s'] for r in resultados):.1f}s)")
+    print(f"Respostas: {total('respostas')} em {args.segundos:.0f}s = {total('respostas') / args.segundos:.0f}/s, {total('erros')} erros de protocolo")
+    print(f"Latência ida e volta: p50 {percentil(50):.2f} ms  p99 {percentil(99):.2f} ms  máx {percentil(100):.2f} ms")
@@ -0,0 +1,103 @@
+"""Gravação da entrada de uma sessão e reprodução exata (main.py --gravar / --reproduzir).
+
+Com a mesma semente para os geradores aleatórios, o mesmo baralho, os mesmos eventos e o
+mesmo dt de cada quadro, o loop principal repete a sessão quadro a quadro. O ficheiro é
+binário e comprimido com gzip: um cabeçalho (semente, tamanho da janela, assinatura do
+baralho), um registo por quadro (dt, posição do rato, eventos) e, no fim, um resumo do estado
+final para a reprodução poder conferir.
+"""
+import gzip
+import hashlib
+import json
+import struct
+
+import pygame
+
+MAGIA, VERSAO = b"AQRG", 2
+CABECALHO = struct.Struct("<4sBQHH8s") # magia, versão, semente, largura, altura, assinatura do baralho
+# Nada é cortado: o SDL nunca guarda mais de 65535 eventos na fila e um dt de 32 bits chega
+# para semanas, por isso um quadro gravado é sempre o quadro jogado.
+QUADRO = struct.Struct("<IhhH")        # dt_ms, rato x, rato y, número de eventos
+FIM_DA_GRAVACAO = 0xFFFFFFFF           # dt reservado: a seguir vem o resumo
+
+# Só os eventos a que o jogo reage; o resto não é gravado
+SAIR, REDIMENSIONAR, TECLA, BOTAO_PREMIDO, BOTAO_SOLTO, MOVIMENTO = range(1, 7)
+TAMANHO = struct.Struct("<HH")
+CODIGO_TECLA = struct.Struct("<iB")
+BOTAO = struct.Struct("<Bhh")
+MOVIMENTO_RATO = struct.Struct("<hhB")
+
+
+def codificar_evento(evento):
+    tipo = evento.type
+    if tipo == pygame.QUIT: return bytes((SAIR,))
+    if tipo == pygame.VIDEORESIZE: return bytes((REDIMENSIONAR,)) + TAMANHO.pack(evento.w, evento.h)
+    if tipo == pygame.KEYDOWN:
+        texto = evento.unicode.encode("utf-8")[:255]
+        return bytes((TECLA,)) + CODIGO_TECLA.pack(evento.key, len(texto)) + texto
+    if tipo in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+        return bytes((BOTAO_PREMIDO if tipo == pygame.MOUSEBUTTONDOWN else BOTAO_SOLTO,)) + BOTAO.pack(evento.button, *evento.pos)
+    if tipo == pygame.MOUSEMOTION:
+        botoes = sum(1 << i for i, premido in enumerate(evento.buttons[:3]) if premido)
+        return bytes((MOVIMENTO,)) + MOVIMENTO_RATO.pack(*evento.pos, botoes)
+    return None
+
+
+def ler_evento(arquivo):
+    tipo = arquivo.read(1)[0]
+    if tipo == SAIR: return pygame.event.Event(pygame.QUIT)
+    if tipo == REDIMENSIONAR:
+        w, h = TAMANHO.unpack(arquivo.read(TAMANHO.size))
+        return pygame.event.Event(pygame.VIDEORESIZE, w=w, h=h, size=(w, h))
+    if tipo == TECLA:
+        tecla, tamanho = CODIGO_TECLA.unpack(arquivo.read(CODIGO_TECLA.size))
+        return pygame.event.Event(pygame.KEYDOWN, key=tecla, unicode=arquivo.read(tamanho).decode("utf-8"), mod=0, scancode=0)
+    if tipo in (BOTAO_PREMIDO, BOTAO_SOLTO):
+        botao, x, y = BOTAO.unpack(arquivo.read(BOTAO.size))
+        return pygame.event.Event(pygame.MOUSEBUTTONDOWN if tipo == BOTAO_PREMIDO else pygame.MOUSEBUTTONUP, button=botao, pos=(x, y))
+    x, y, botoes = MOVIMENTO_RATO.unpack(arquivo.read(MOVIMENTO_RATO.size))
+    return pygame.event.Event(pygame.MOUSEMOTION, pos=(x, y), rel=(0, 0), buttons=tuple(bool(botoes >> i & 1) for i in range(3)))
+
+
+def assinatura_baralho(baralho):
+    """8 bytes que identificam as cartas em jogo; zeros sem baralho (letras de A a Z)."""
+    if baralho is None: return bytes(8)
+    cartas = json.dumps(list(zip(baralho.rotulos, baralho.respostas)), ensure_ascii=False).encode()
+    return hashlib.blake2b(cartas, digest_size=8).digest()
+
+
+class GravadorEntrada:
+    def __init__(self, caminho, semente, tamanho, baralho=None):
+        self.arquivo = gzip.open(caminho, "wb")
+        self.arquivo.write(CABECALHO.pack(MAGIA, VERSAO, semente, *tamanho, assinatura_baralho(baralho)))
+
+    def quadro(self, dt_ms, pos_rato, eventos):
+        codificados = [c for c in map(codificar_evento, eventos) if c]
+        self.arquivo.write(QUADRO.pack(dt_ms, *pos_rato, len(codificados)) + b"".join(codificados))
+
+    def fechar(self, resumo):
+        dados = json.dumps(resumo).encode()
+        self.arquivo.write(QUADRO.pack(FIM_DA_GRAVACAO, 0, 0, 0) + struct.pack("<I", len(dados)) + dados)
+        self.arquivo.close()
+
+
+class LeitorEntrada:
+    """Lê uma gravação quadro a quadro; `resumo` fica disponível depois do último quadro."""
+
+    def __init__(self, caminho):
+        self.arquivo = gzip.open(caminho, "rb")
+        magia, versao, self.semente, largura, altura, self.baralho = CABECALHO.unpack(self.arquivo.read(CABECALHO.size))
+        if magia != MAGIA or versao != VERSAO: raise ValueError(f"{caminho}: não é uma gravação válida")
+        self.tamanho = (largura, altura)
+        self.resumo = None
+
+    def proximo_quadro(self):
+        """(dt_ms, posição do rato, eventos) do quadro seguinte, ou None no fim."""
+        dados = self.arquivo.read(QUADRO.size)
+        if len(dados) < QUADRO.size: return None  # gravação interrompida: reproduz o que houver
+        dt_ms, x, y, quantidade = QUADRO.unpack(dados)
+        if dt_ms == FIM_DA_GRAVACAO:
+            tamanho, = struct.unpack("<I", self.arquivo.read(4))
+            self.resumo = json.loads(self.arquivo.read(tamanho))
+            return None
+        return dt_ms, (x, y), [ler_evento(self.arquivo) for _ in range(quantidade)]
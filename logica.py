@@ -0,0 +1,123 @@
+"""Regras do jogo, sem Pygame: pontuação, vidas, bónus por sequência, níveis e sorteio de letras.
+
+Usado pela janela (main.py) e pelo simulador de balanceamento (simulador.py). As cartas a
+sortear vêm de um Baralho (baralho.py); por omissão, as letras de A a Z.
+"""
+import random
+
+from baralho import Baralho, TAMANHO_HISTORICO
+
+LETRAS_NUMEROS = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, 'H': 8, 'I': 9, 'J': 10, 'K': 11, 'L': 12, 'M': 13, 'N': 14, 'O': 15, 'P': 16, 'Q': 17, 'R': 18, 'S': 19, 'T': 20, 'U': 21, 'V': 22, 'W': 23, 'X': 24, 'Y': 25, 'Z': 26}
+TODAS_LETRAS = list(LETRAS_NUMEROS.keys())
+
+VIDAS_INICIAIS = 3
+# Quantas letras (a partir do A) entram no sorteio em cada nível; outros baralhos usam a mesma proporção
+LETRAS_POR_NIVEL = (10, 15, len(TODAS_LETRAS))
+# Acertos consecutivos necessários para chegar a cada nível
+SEQUENCIA_POR_NIVEL = (0, 5, 10)
+NOMES_NIVEL = {1: "Médio", 2: "Difícil"}
+# (múltiplo da sequência, pontos extra), do mais raro para o mais comum; só o primeiro que bater conta
+BONUS_SEQUENCIA = ((100, 100), (50, 50), (25, 25), (10, 10), (5, 5))
+# Distância máxima da resposta certa para cada faixa de erro
+FAIXAS_ERRO = ((2, "perto"), (5, "medio"))
+
+
+def bonus_sequencia(acertos_consecutivos):
+    """Pontos extra por chegar a uma sequência múltipla de 5/10/25/50/100 (0 se nenhuma)."""
+    if acertos_consecutivos > 0:
+        for multiplo, pontos in BONUS_SEQUENCIA:
+            if acertos_consecutivos % multiplo == 0: return pontos
+    return 0
+
+
+def faixa_erro(diferenca):
+    for limite, faixa in FAIXAS_ERRO:
+        if diferenca <= limite: return faixa
+    return "longe"
+
+
+def nivel_para_sequencia(acertos_consecutivos):
+    nivel = 0
+    for indice, minimo in enumerate(SEQUENCIA_POR_NIVEL):
+        if acertos_consecutivos >= minimo: nivel = indice
+    return nivel
+
+
+class ResultadoResposta:
+    __slots__ = ("correta", "bonus", "faixa", "fim_de_jogo")
+
+    def __init__(self, correta, bonus=0, faixa=None, fim_de_jogo=False):
+        self.correta, self.bonus, self.faixa, self.fim_de_jogo = correta, bonus, faixa, fim_de_jogo
+
+
+def limite_nivel(quantidade_cartas, nivel):
+    """Quantas cartas (a partir da primeira) entram no sorteio no `nivel`."""
+    return max(1, quantidade_cartas * LETRAS_POR_NIVEL[nivel] // LETRAS_POR_NIVEL[-1])
+
+
+def descricao_nivel(rotulos, nivel):
+    """O que entra no sorteio no `nivel`, a partir dos rótulos do baralho ("Letras de A a O")."""
+    limite = limite_nivel(len(rotulos), nivel)
+    letras = rotulos == TODAS_LETRAS
+    if limite >= len(rotulos): return "Todo o alfabeto" if letras else f"Todas as {len(rotulos)} cartas"
+    return f"{'Letras' if letras else 'Cartas'} de {rotulos[0]} a {rotulos[limite - 1]}"
+
+
+class Partida:
+    """Estado de uma partida; `rng` permite usar um gerador próprio (reprodutível)."""
+    __slots__ = ("rng", "baralho", "pontuacao", "vidas", "acertos_consecutivos", "letras_erradas_info",
+                 "dificuldade_mantida", "indice_carta", "letra_sorteada", "numero_correto")
+
+    def __init__(self, rng=None, baralho=None):
+        self.rng = rng or random.Random()
+        self.baralho = baralho or Baralho(list(LETRAS_NUMEROS.items()), TAMANHO_HISTORICO)
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.pontuacao, self.vidas, self.acertos_consecutivos = 0, VIDAS_INICIAIS, 0
+        self.letras_erradas_info = []
+        self.dificuldade_mantida = 0
+        self.baralho.reiniciar()
+        self.indice_carta, self.letra_sorteada, self.numero_correto = 0, "", 0
+        self.sortear_letra()
+
+    @property
+    def terminada(self):
+        return self.vidas <= 0
+
+    @property
+    def iniciada(self):
+        return self.pontuacao > 0 or self.vidas < VIDAS_INICIAIS
+
+    def sortear_letra(self):
+        """Sorteia entre as cartas do nível atual, evitando as últimas e favorecendo as erradas."""
+        baralho = self.baralho
+        self.indice_carta = baralho.sortear(limite_nivel(len(baralho), self.dificuldade_mantida), self.rng)
+        self.letra_sorteada, self.numero_correto = baralho.rotulos[self.indice_carta], baralho.respostas[self.indice_carta]
+
+    def responder(self, resposta):
+        """Aplica a resposta; se a partida continuar, já sorteia a letra seguinte."""
+        self.baralho.registrar_resposta(self.indice_carta, resposta == self.numero_correto)
+        if resposta == self.numero_correto:
+            self.acertos_consecutivos += 1; self.pontuacao += 1
+            bonus = bonus_sequencia(self.acertos_consecutivos)
+            self.pontuacao += bonus
+            resultado = ResultadoResposta(True, bonus=bonus)
+        else:
+            self.vidas -= 1
+            self.acertos_consecutivos = 0
+            self.letras_erradas_info.append((self.letra_sorteada, self.numero_correto))
+            resultado = ResultadoResposta(False, faixa=faixa_erro(abs(resposta - self.numero_correto)), fim_de_jogo=self.terminada)
+        if not resultado.fim_de_jogo: self.sortear_letra()
+        return resultado
+
+    def atualizar_nivel(self):
+        """Sobe de nível conforme a sequência atual (nunca desce). Devolve o novo nível ou None."""
+        proximo_nivel_id = nivel_para_sequencia(self.acertos_consecutivos)
+        if proximo_nivel_id > self.dificuldade_mantida:
+            self.dificuldade_mantida = proximo_nivel_id
+            return proximo_nivel_id
+        return None
+
+    def descricao_nivel(self, nivel):
+        return descricao_nivel(self.baralho.rotulos, nivel)
@@ -1,8 +1,26 @@
+import time
+INICIO_PROCESSO = time.perf_counter()
+
 import pygame
 import random
 import sys
 import os
+import io
 import math
+import argparse
+import queue
+import threading
+import numpy as np
+from collections import OrderedDict, namedtuple
+from logica import Partida, NOMES_NIVEL
+from baralho import carregar_baralho
+from servidor import ErroProtocolo, PartidaRemota
+from perfil import ProfilerQuadros, ProfilerNulo, ContadorLatencia, FASES
+from animacao import Agendador, ease_out_quad, ease_in_out_quad
+from registro import abrir_registro, RegistroNulo
+from gravacao import GravadorEntrada, LeitorEntrada, assinatura_baralho
+from audio import SistemaAudio
+from pacote_assets import ARQUIVO_PACOTE, abrir_pacote
 
 # --- Função para encontrar os ficheiros (assets) ---
 def resource_path(relative_path):
@@ -15,6 +33,62 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
 
+# --- OPÇÕES DE LINHA DE COMANDO ---
+parser = argparse.ArgumentParser(description="Adivinhe o Número da Letra")
+parser.add_argument("--retangulos-sujos", action="store_true",
+                    help="guarda as partes estáticas de cada tela e atualiza só as regiões que mudaram")
+parser.add_argument("--perfil", action="store_true",
+                    help="mede cada fase do quadro e mostra os percentis num painel (F3 mostra/esconde)")
+parser.add_argument("--perfil-csv", metavar="ARQUIVO",
+                    help="grava os tempos de cada quadro neste CSV (ativa a medição)")
+parser.add_argument("--fps", type=int,
+                    help="limite de quadros por segundo enquanto há animação (0 = sem limite; padrão: 60, ou a taxa do monitor com pygame-ce)")
+parser.add_argument("--desenho-em-thread", action="store_true",
+                    help="experimental: desenha numa thread à parte, com entrada e lógica a ritmo fixo na thread "
+                         "principal; por causa do GIL a latência até ao ecrã fica pior, não melhor")
+parser.add_argument("--latencia", action="store_true",
+                    help="ao sair, mostra a latência da entrada até à lógica e até ao ecrã (também no painel do F3)")
+parser.add_argument("--baralho", metavar="ARQUIVO", help="joga com as cartas deste ficheiro (uma 'rótulo;número' por linha)")
+parser.add_argument("--servidor", metavar="ENDEREÇO", help="joga numa sessão do servidor.py (host:porta ou socket Unix)")
+parser.add_argument("--sem-historico", action="store_true", help="não grava as respostas em historico.db")
+parser.add_argument("--semente", type=int, help="semente dos geradores aleatórios (sessão reprodutível)")
+parser.add_argument("--gravar", metavar="ARQUIVO", help="grava a entrada da sessão para a reproduzir depois com --reproduzir")
+parser.add_argument("--reproduzir", metavar="ARQUIVO", help="repete uma sessão gravada com --gravar, ao ritmo original")
+parser.add_argument("--sem-desenho", action="store_true",
+                    help="com --reproduzir: corre o mais depressa possível, sem janela nem desenho")
+parser.add_argument("--tamanho", metavar="LxA", help="tamanho inicial da janela, por exemplo 1920x1080")
+parser.add_argument("--benchmark", metavar="ESTADO", help="modo de benchmark (usado por benchmark.py)")
+parser.add_argument("--benchmark-quadros", type=int, default=300, help=argparse.SUPPRESS)
+parser.add_argument("--benchmark-saida", default="benchmark_resultado.json", help=argparse.SUPPRESS)
+parser.add_argument("--benchmark-memoria", action="store_true", help=argparse.SUPPRESS)
+parser.add_argument("--benchmark-dt", type=int, help=argparse.SUPPRESS)
+parser.add_argument("--benchmark-verificar", action="store_true", help=argparse.SUPPRESS)
+parser.add_argument("--tempos-carregamento", action="store_true",
+                    help="mostra quanto demorou cada asset e o tempo até ao primeiro quadro")
+args, _ = parser.parse_known_args()
+
+# --- MEDIÇÃO DE DESEMPENHO ---
+profiler = ProfilerQuadros(caminho_csv=args.perfil_csv) if args.perfil or args.perfil_csv else ProfilerNulo()
+hud_perfil_visivel = args.perfil
+linhas_hud_perfil = []
+
+# --- GRAVAÇÃO E REPRODUÇÃO ---
+# Cada fonte de aleatoriedade tem o seu gerador, todos derivados de uma só semente: a mesma
+# semente com a mesma entrada (eventos e dt de cada quadro) repete a sessão exatamente.
+leitor_entrada = LeitorEntrada(args.reproduzir) if args.reproduzir else None
+gravador_entrada = None
+if leitor_entrada: SEMENTE = leitor_entrada.semente
+elif args.semente is not None: SEMENTE = args.semente
+elif args.benchmark: SEMENTE = 0
+elif args.gravar: SEMENTE = int.from_bytes(os.urandom(8), "little") >> 1
+else: SEMENTE = None
+fluxos = np.random.SeedSequence(SEMENTE).spawn(5)
+rng_partida, rng_mensagens, rng_letras, rng_tremor = (random.Random(int(f.generate_state(1)[0])) for f in fluxos[:4])
+rng_particulas = np.random.default_rng(fluxos[4])
+reproducao_rapida = bool(leitor_entrada and args.sem_desenho)
+if reproducao_rapida:
+    os.environ["SDL_VIDEODRIVER"] = "dummy"; os.environ["SDL_AUDIODRIVER"] = "dummy"
+
 # --- CONFIGURAÇÕES INICIAIS ---
 
 pygame.init()
@@ -22,6 +96,9 @@ pygame.mixer.init()
 
 BASE_LARGURA, BASE_ALTURA = 1280, 720
 LARGURA_TELA, ALTURA_TELA = BASE_LARGURA, BASE_ALTURA
+if args.tamanho:
+    LARGURA_TELA, ALTURA_TELA = (int(valor) for valor in args.tamanho.lower().split("x"))
+if leitor_entrada: LARGURA_TELA, ALTURA_TELA = leitor_entrada.tamanho
 tela = pygame.display.set_mode((LARGURA_TELA, ALTURA_TELA), pygame.RESIZABLE)
 pygame.display.set_caption("Adivinhe o Número da Letra")
 
@@ -39,6 +116,8 @@ VERMELHO_BRILHANTE = (190, 40, 40)
 
 
 # --- Funções para o sistema de recorde ---
+# O recorde é lido uma vez no arranque e fica em memória (recorde_atual); a gravação corre na
+# thread do histórico de respostas, fora do loop.
 ARQUIVO_RECORDE = "recorde.txt"
 
 def carregar_recorde():
@@ -53,89 +132,313 @@ def salvar_recorde(pontuacao):
         with open(ARQUIVO_RECORDE, 'w') as f: f.write(str(pontuacao))
     except IOError as e: print(f"Erro ao salvar o recorde: {e}")
 
-# --- Classe para o sistema de partículas ---
-class Particula:
-    def __init__(self, x, y):
-        self.x, self.y = x, y
-        self.raio = random.randint(3, 8)
-        self.cor = random.choice([AZUL, VERDE, AMARELO, BRANCO])
-        self.velocidade = random.uniform(2, 6)
-        self.angulo = random.uniform(0, 2 * math.pi)
-        self.vx, self.vy = math.cos(self.angulo) * self.velocidade, math.sin(self.angulo) * self.velocidade
-        self.vida = random.randint(30, 60)
+# --- Cache LRU para superfícies de texto e layouts de quebra de linha ---
+class CacheLRU:
+    """Cache limitado que descarta o item usado há mais tempo; conta acertos e falhas."""
+    def __init__(self, capacidade):
+        self.capacidade = capacidade
+        self.itens = OrderedDict()
+        self.acertos, self.falhas = 0, 0
+
+    def obter(self, chave):
+        valor = self.itens.get(chave)
+        if valor is None:
+            self.falhas += 1
+            return None
+        self.acertos += 1
+        self.itens.move_to_end(chave)
+        return valor
+
+    def guardar(self, chave, valor):
+        self.itens[chave] = valor
+        self.itens.move_to_end(chave)
+        if len(self.itens) > self.capacidade:
+            self.itens.popitem(last=False)
+
+    def limpar(self):
+        self.itens.clear()
+
+    def taxa_acerto(self):
+        total = self.acertos + self.falhas
+        return self.acertos / total if total else 0.0
+
+# --- Pool de superfícies do tamanho da janela ---
+class PoolSuperficies:
+    """Superfícies de trabalho do tamanho da janela, criadas uma vez e reutilizadas a cada quadro.
+
+    Ao redimensionar a janela todas são descartadas e recriadas no próximo pedido.
+    """
+    def __init__(self):
+        self.tamanho = None
+        self.superficies = {}
+
+    def redimensionar(self, tamanho):
+        if tamanho != self.tamanho:
+            self.tamanho = tamanho
+            self.superficies.clear()
+
+    def obter(self, nome, criar):
+        superficie = self.superficies.get(nome)
+        if superficie is None:
+            superficie = self.superficies[nome] = criar(self.tamanho)
+        return superficie
+
+pool_superficies = PoolSuperficies()
+
+# Textos renderizados: (texto, fonte, cor, escala) -> Surface
+cache_texto = CacheLRU(256)
+# Quebras de linha: (texto, fonte, largura) -> tupla de linhas
+cache_quebra = CacheLRU(64)
+
+# --- Sistema de partículas (arrays NumPy + atlas de sprites) ---
+CORES_PARTICULAS = (AZUL, VERDE, AMARELO, BRANCO)
+RAIO_MIN_PARTICULA, RAIO_MAX_PARTICULA = 3, 8
+VIDA_MAX_PARTICULA = 60
+NIVEIS_ALPHA_PARTICULA = 16
+PARTICULAS_POR_ACERTO = 30
+
+FotoParticulas = namedtuple("FotoParticulas", ("pos", "pos_anterior", "raio", "cor", "vida"))
+
+class SistemaParticulas:
+    """Guarda todas as partículas em arrays; atualização vetorizada e desenho via atlas."""
+    def __init__(self, capacidade=256):
+        self.quantidade = 0
+        self.pos = np.zeros((capacidade, 2), np.float32)
+        self.pos_anterior = np.zeros((capacidade, 2), np.float32)  # posição no passo anterior, para interpolar
+        self.vel = np.zeros((capacidade, 2), np.float32)
+        self.vida = np.zeros(capacidade, np.int16)
+        self.raio = np.zeros(capacidade, np.int16)
+        self.cor = np.zeros(capacidade, np.int16)
+        self.atlas = None
+
+    def __len__(self):
+        return self.quantidade
+
+    def _crescer(self, minimo):
+        capacidade = len(self.vida)
+        while capacidade < minimo: capacidade *= 2
+        for nome in ("pos", "pos_anterior", "vel", "vida", "raio", "cor"):
+            antigo = getattr(self, nome)
+            novo = np.zeros((capacidade,) + antigo.shape[1:], antigo.dtype)
+            novo[:self.quantidade] = antigo[:self.quantidade]
+            setattr(self, nome, novo)
+
+    def emitir(self, x, y, n):
+        inicio, fim = self.quantidade, self.quantidade + n
+        if fim > len(self.vida): self._crescer(fim)
+        velocidade = rng_particulas.uniform(2, 6, n)
+        angulo = rng_particulas.uniform(0, 2 * math.pi, n)
+        self.pos[inicio:fim] = (x, y)
+        self.pos_anterior[inicio:fim] = (x, y)
+        self.vel[inicio:fim, 0] = np.cos(angulo) * velocidade
+        self.vel[inicio:fim, 1] = np.sin(angulo) * velocidade
+        self.vida[inicio:fim] = rng_particulas.integers(30, VIDA_MAX_PARTICULA + 1, n)
+        self.raio[inicio:fim] = rng_particulas.integers(RAIO_MIN_PARTICULA, RAIO_MAX_PARTICULA + 1, n)
+        self.cor[inicio:fim] = rng_particulas.integers(0, len(CORES_PARTICULAS), n)
+        self.quantidade = fim
+
+    def limpar(self):
+        self.quantidade = 0
+
+    def fotografar(self, copiar=False):
+        """Partículas vivas para o desenho; com `copiar`, arrays próprios que a simulação não altera depois."""
+        n = self.quantidade
+        if n == 0: return None
+        arrays = (self.pos[:n], self.pos_anterior[:n], self.raio[:n], self.cor[:n], self.vida[:n])
+        return FotoParticulas(*(array.copy() for array in arrays) if copiar else arrays)
 
     def update(self):
-        self.x += self.vx; self.y += self.vy
-        self.vida -= 1
-        self.vx *= 0.95; self.vy *= 0.95
+        """Avança um passo fixo da simulação."""
+        n = self.quantidade
+        if n == 0: return
+        self.pos_anterior[:n] = self.pos[:n]
+        self.pos[:n] += self.vel[:n]
+        self.vida[:n] -= 1
+        self.vel[:n] *= 0.95
+        # Compacta trocando: os buracos na parte que fica são preenchidos pelas vivas do fim
+        vivas = self.vida[:n] > 0
+        restantes = int(np.count_nonzero(vivas))
+        if restantes == n: return
+        buracos = np.flatnonzero(~vivas[:restantes])
+        origens = np.flatnonzero(vivas[restantes:]) + restantes
+        for array in (self.pos, self.pos_anterior, self.vel, self.vida, self.raio, self.cor):
+            array[buracos] = array[origens]
+        self.quantidade = restantes
+
+    def _construir_atlas(self):
+        """Pré-renderiza um sprite por combinação de raio, cor e nível de transparência."""
+        self.atlas = []
+        for raio in range(RAIO_MIN_PARTICULA, RAIO_MAX_PARTICULA + 1):
+            for cor in CORES_PARTICULAS:
+                for nivel in range(NIVEIS_ALPHA_PARTICULA):
+                    alpha = round(255 * nivel / (NIVEIS_ALPHA_PARTICULA - 1))
+                    sprite = pygame.Surface((raio * 2, raio * 2), pygame.SRCALPHA)
+                    pygame.draw.circle(sprite, (*cor, alpha), (raio, raio), raio)
+                    self.atlas.append(sprite)
 
-    def draw(self, superficie):
-        alpha = max(0, 255 * (self.vida / 60))
-        temp_surf = pygame.Surface((self.raio * 2, self.raio * 2), pygame.SRCALPHA)
-        pygame.draw.circle(temp_surf, (*self.cor, alpha), (self.raio, self.raio), self.raio)
-        superficie.blit(temp_surf, (self.x - self.raio, self.y - self.raio))
+    def draw(self, superficie, foto, alpha=1.0):
+        """Desenha as partículas da foto e devolve o retângulo que as contém (ou None).
+
+        `alpha` é a fração já decorrida do próximo passo: a posição é interpolada entre passos.
+        """
+        if foto is None: return None
+        inicio = profiler.relogio()
+        if self.atlas is None: self._construir_atlas()
+        raio, vida = foto.raio, foto.vida
+        nivel = np.clip(np.rint(vida * ((NIVEIS_ALPHA_PARTICULA - 1) / VIDA_MAX_PARTICULA)), 0, NIVEIS_ALPHA_PARTICULA - 1).astype(np.intp)
+        indice = ((raio - RAIO_MIN_PARTICULA) * len(CORES_PARTICULAS) + foto.cor) * NIVEIS_ALPHA_PARTICULA + nivel
+        pos = foto.pos_anterior + (foto.pos - foto.pos_anterior) * alpha
+        canto = (pos - raio[:, None]).astype(np.intp)
+        atlas = self.atlas
+        superficie.blits([(atlas[i], (x, y)) for i, (x, y) in zip(indice.tolist(), canto.tolist())], doreturn=False)
+        (x0, y0), (x1, y1) = canto.min(axis=0), (canto + 2 * raio[:, None]).max(axis=0)
+        profiler.acumular("particulas", inicio)
+        return pygame.Rect(int(x0), int(y0), int(x1 - x0), int(y1 - y0))
 
 # --- Classe para as letras flutuantes do menu ---
+ALFABETO = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+TAMANHOS_LETRA_FLUTUANTE = tuple(range(40, 121, 10))
+NUM_LETRAS_FLUTUANTES = 15
+pool_fontes_padrao = {}
+atlas_letras = {}
+
+def obter_fonte_padrao(tamanho):
+    """Devolve a fonte padrão do Pygame no tamanho pedido, criando-a só uma vez."""
+    fonte = pool_fontes_padrao.get(tamanho)
+    if fonte is None:
+        fonte = pool_fontes_padrao[tamanho] = pygame.font.Font(None, tamanho)
+    return fonte
+
+def construir_atlas_letras():
+    """Pré-renderiza todas as letras em todos os tamanhos usados no fundo do menu."""
+    for tamanho in TAMANHOS_LETRA_FLUTUANTE:
+        fonte = obter_fonte_padrao(tamanho)
+        for letra in ALFABETO:
+            atlas_letras[(letra, tamanho)] = fonte.render(letra, True, CINZA_ESCURO)
+
+FotoLetra = namedtuple("FotoLetra", ("glifo", "x", "y_anterior", "y", "alpha"))
+
+def posicao_letra(letra, alpha):
+    return (letra.x, letra.y_anterior + (letra.y - letra.y_anterior) * alpha)
+
 class LetraFlutuante:
+    __slots__ = ("glifo", "x", "y", "y_anterior", "velocidade_y", "alpha", "max_alpha", "estado", "tempo_visivel", "duracao_visivel")
+
     def __init__(self, largura_tela, altura_tela):
-        self.letra = random.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
-        self.fonte = pygame.font.Font(None, random.randint(40, 120))
-        self.x = random.randint(0, largura_tela)
-        self.y = random.randint(0, altura_tela)
-        self.velocidade_y = random.uniform(0.1, 0.5)
+        self.sortear(largura_tela, altura_tela)
+
+    def sortear(self, largura_tela, altura_tela):
+        if not atlas_letras: construir_atlas_letras()
+        self.glifo = atlas_letras[(rng_letras.choice(ALFABETO), rng_letras.choice(TAMANHOS_LETRA_FLUTUANTE))]
+        self.x = rng_letras.randint(0, largura_tela)
+        self.y = self.y_anterior = rng_letras.randint(0, altura_tela)
+        self.velocidade_y = rng_letras.uniform(0.1, 0.5)
         self.alpha = 0
-        self.max_alpha = random.randint(20, 80)
+        self.max_alpha = rng_letras.randint(20, 80)
         self.estado = "aparecendo"
-        self.tempo_visivel = pygame.time.get_ticks()
-        self.duracao_visivel = random.randint(2000, 5000)
+        self.tempo_visivel = tempo_jogo_ms
+        self.duracao_visivel = rng_letras.randint(2000, 5000)
 
     def update(self, largura_tela, altura_tela):
+        self.y_anterior = self.y
         self.y -= self.velocidade_y
         if self.y < -100:
-            self.y = altura_tela + 100
-            self.x = random.randint(0, largura_tela)
+            self.y = self.y_anterior = altura_tela + 100
+            self.x = rng_letras.randint(0, largura_tela)
 
         if self.estado == "aparecendo":
             self.alpha += 0.5
             if self.alpha >= self.max_alpha:
                 self.alpha = self.max_alpha
                 self.estado = "visivel"
-                self.tempo_visivel = pygame.time.get_ticks()
+                self.tempo_visivel = tempo_jogo_ms
         elif self.estado == "visivel":
-            if pygame.time.get_ticks() - self.tempo_visivel > self.duracao_visivel:
+            if tempo_jogo_ms - self.tempo_visivel > self.duracao_visivel:
                 self.estado = "desaparecendo"
         elif self.estado == "desaparecendo":
             self.alpha -= 0.5
             if self.alpha <= 0:
-                self.__init__(largura_tela, altura_tela)
+                self.sortear(largura_tela, altura_tela)
 
-    def draw(self, superficie):
-        text_surf = self.fonte.render(self.letra, True, CINZA_ESCURO)
-        text_surf.set_alpha(self.alpha)
-        superficie.blit(text_surf, (self.x, self.y))
+    def foto(self):
+        return FotoLetra(self.glifo, self.x, self.y_anterior, self.y, self.alpha)
 
 # --- CARREGAMENTO DE ASSETS ---
-try:
-    fundo_original = pygame.image.load(resource_path("fundo.png")).convert()
-except (FileNotFoundError, pygame.error):
-    fundo_original = None
+# Os assets são lidos numa thread para a janela aparecer logo. Até chegarem, o jogo usa
+# substitutos: fundo preto, fonte padrão do Pygame e nenhum som. Se existir o pacote gerado por
+# pacote_assets.py, tudo vem dele (mapeado com mmap, imagens já em píxeis do ecrã e pré-escaladas);
+# senão, dos ficheiros soltos.
+fundo_original = None
 fundo = None
+pacote = abrir_pacote(resource_path(ARQUIVO_PACOTE))
+
+# Efeitos sonoros (ver audio.py): o erro é mais importante e pode roubar o canal de um acerto
+audio = SistemaAudio()
+audio.registrar("acerto", resource_path("acerto.mp3"), prioridade=1)
+audio.registrar("erro", resource_path("erro.mp3"), prioridade=2)
+
+def no_pacote(caminho_relativo):
+    return pacote is not None and caminho_relativo in pacote
+
+def ler_bytes(caminho_relativo):
+    if no_pacote(caminho_relativo): return pacote.bytes(caminho_relativo)
+    with open(resource_path(caminho_relativo), 'rb') as f: return f.read()
+
+def carregar_imagem(caminho_relativo):
+    """Do pacote: superfície sobre o mmap, sem descodificar nem copiar. Solta: PNG descodificado."""
+    if no_pacote(caminho_relativo): return pacote.imagem(caminho_relativo)
+    return pygame.image.load(resource_path(caminho_relativo))
+
+TAREFAS_ASSETS = (
+    ("fonte", lambda: ler_bytes("DejaVuSans.ttf")),
+    ("fundo", lambda: carregar_imagem("fundo.png")),
+    *((f"som_{nome}", lambda nome=nome: audio.carregar(nome, pacote)) for nome in audio.efeitos),
+    ("musica", lambda: ler_bytes("musica_fundo.mp3")),
+)
 
-try:
-    som_acerto = pygame.mixer.Sound(resource_path("acerto.mp3"))
-except pygame.error:
-    som_acerto = None
-try:
-    som_erro = pygame.mixer.Sound(resource_path("erro.mp3"))
-except pygame.error:
-    som_erro = None
+class CarregadorAssets:
+    """Carrega os assets numa thread e entrega-os ao loop principal através de uma fila."""
+    def __init__(self, tarefas):
+        self.tarefas = tarefas
+        self.fila = queue.Queue()
+        self.pendentes = {nome for nome, _ in tarefas}
+        self.tempos = {}  # nome -> milissegundos de carregamento
+        self.thread = threading.Thread(target=self._carregar, name="carregador-assets", daemon=True)
 
-try:
-    pygame.mixer.music.load(resource_path("musica_fundo.mp3"))
-    pygame.mixer.music.set_volume(0.05)
-    pygame.mixer.music.play(-1)
-except pygame.error:
-    print("Aviso: 'musica_fundo.mp3' não encontrada.")
+    def iniciar(self):
+        self.thread.start()
+
+    def _carregar(self):
+        for nome, carregar in self.tarefas:
+            inicio = time.perf_counter()
+            try:
+                valor = carregar()
+            except (OSError, pygame.error):
+                valor = None
+            except Exception as e:
+                # Também tem de chegar à fila: um asset que nunca chega deixava "Carregando..." no
+                # ecrã para sempre e o desenho preso no modo "animando"
+                print(f"Aviso: falha ao carregar '{nome}' ({e!r}).")
+                valor = None
+            self.tempos[nome] = (time.perf_counter() - inicio) * 1000
+            self.fila.put((nome, valor))
+
+    @property
+    def carregando(self):
+        return bool(self.pendentes)
+
+    def processar(self, ao_receber):
+        """Chamado a cada quadro: entrega ao `ao_receber` os assets que já terminaram."""
+        while True:
+            try:
+                nome, valor = self.fila.get_nowait()
+            except queue.Empty:
+                return
+            self.pendentes.discard(nome)
+            ao_receber(nome, valor)
+
+carregador = CarregadorAssets(TAREFAS_ASSETS)
+carregador.iniciar()
 
 
 # --- LÓGICA DE ESCALA DINÂMICA ---
@@ -144,39 +447,88 @@ input_rect_dims = {}
 reset_button_rect, settings_button_rect, settings_button_menu_rect = None, None, None
 music_slider_rect, sfx_slider_rect, music_handle_rect, sfx_handle_rect, settings_close_button_rect = (None,) * 5
 
-def atualizar_elementos_escala(largura, altura):
-    global LARGURA_TELA, ALTURA_TELA, tela, fundo
+# Durante um arrastar da janela chegam dezenas de VIDEORESIZE por segundo: só depois desta
+# pausa sem eventos é feito o redimensionamento de qualidade; até lá mostra-se uma prévia barata.
+ATRASO_REDIMENSIONAMENTO_MS = 150
+PASSO_ESCALA_PREVIA = 0.05
+TAMANHO_FUNDO_PREVIA = (320, 180)
+cache_fundos = CacheLRU(4)     # (largura, altura) -> fundo escalado com smoothscale
+cache_fontes = CacheLRU(48)    # (usa_dejavu, tamanho) -> pygame.font.Font
+fundo_previa = None
+dados_fonte_ttf = None         # bytes de DejaVuSans.ttf, entregues pelo carregador de assets
+versao_visual = 0              # muda sempre que fontes ou fundo são trocados
+
+def obter_fonte(tamanho, dejavu=False):
+    """Fonte do cache; a DejaVu é criada a partir dos bytes em memória, sem reabrir o ficheiro.
+
+    Enquanto a DejaVu não estiver carregada (ou se faltar), usa a fonte padrão do Pygame (sem emojis).
+    """
+    dejavu = dejavu and dados_fonte_ttf is not None
+    chave = (dejavu, tamanho)
+    fonte = cache_fontes.obter(chave)
+    if fonte is None:
+        try:
+            fonte = pygame.font.Font(io.BytesIO(dados_fonte_ttf) if dejavu else None, tamanho)
+        except pygame.error:
+            fonte = pygame.font.Font(None, tamanho)
+        cache_fontes.guardar(chave, fonte)
+    return fonte
+
+def escalar_fundo(tamanho):
+    """Versão pré-escalada do pacote, se houver para este tamanho; senão smoothscale do original."""
+    if no_pacote("fundo.png"):
+        superficie = pacote.imagem("fundo.png", tamanho)
+        if superficie is not None: return superficie
+        return pygame.transform.smoothscale(fundo_original, tamanho).convert()  # o original do pacote tem canal alfa
+    return pygame.transform.smoothscale(fundo_original, tamanho)
+
+def obter_fundo(largura, altura, previa=False):
+    """Fundo escalado para o tamanho da janela: prévia rápida ou versão suavizada guardada em cache."""
+    global fundo_previa
+    if not fundo_original: return None
+    if previa:
+        # Opaca no formato do ecrã: é reescalada e desenhada inteira a cada passo do arrastar
+        if fundo_previa is None: fundo_previa = escalar_fundo(TAMANHO_FUNDO_PREVIA).convert()
+        return pygame.transform.scale(fundo_previa, (largura, altura))
+    superficie = cache_fundos.obter((largura, altura))
+    if superficie is None:
+        superficie = escalar_fundo((largura, altura))
+        cache_fundos.guardar((largura, altura), superficie)
+    return superficie
+
+def carregar_fontes(escala_fontes):
     global fonte_para_emojis, fonte_titulo, fonte_grande, fonte_media, fonte_pequena, fonte_botao, fonte_feedback, fonte_creditos
+    global versao_visual
+    # As superfícies e layouts guardados pertencem às fontes antigas
+    cache_texto.limpar(); cache_quebra.limpar()
+    versao_visual += 1
+    fonte_para_emojis = obter_fonte(int(65 * escala_fontes), dejavu=True)
+    fonte_feedback = obter_fonte(int(48 * escala_fontes), dejavu=True)
+    fonte_titulo = obter_fonte(int(95 * escala_fontes))
+    fonte_grande = obter_fonte(int(200 * escala_fontes))
+    fonte_media = obter_fonte(int(65 * escala_fontes))
+    fonte_pequena = obter_fonte(int(48 * escala_fontes))
+    fonte_botao = obter_fonte(int(55 * escala_fontes))
+    fonte_creditos = obter_fonte(int(28 * escala_fontes))
+
+def atualizar_elementos_escala(largura, altura, previa=False):
+    global LARGURA_TELA, ALTURA_TELA, tela, fundo
     global input_rect_dims, reset_button_rect, settings_button_rect, settings_button_menu_rect
     global music_slider_rect, sfx_slider_rect, music_handle_rect, sfx_handle_rect, settings_close_button_rect
 
     LARGURA_TELA, ALTURA_TELA = largura, altura
-    tela = pygame.display.set_mode((LARGURA_TELA, ALTURA_TELA), pygame.RESIZABLE)
+    pool_superficies.redimensionar((LARGURA_TELA, ALTURA_TELA))
     escala = ALTURA_TELA / BASE_ALTURA
+    if previa:
+        # Enquanto a janela é arrastada, o Pygame já redimensionou a superfície do ecrã
+        tela = pygame.display.get_surface()
+        escala_fontes = max(PASSO_ESCALA_PREVIA, round(escala / PASSO_ESCALA_PREVIA) * PASSO_ESCALA_PREVIA)
+    else:
+        tela = pygame.display.set_mode((LARGURA_TELA, ALTURA_TELA), pygame.RESIZABLE)
+        escala_fontes = escala
 
-    if fundo_original:
-        fundo = pygame.transform.scale(fundo_original, (LARGURA_TELA, ALTURA_TELA))
-
-    # --- MUDANÇA AQUI: Lógica de carregamento de fontes mais robusta para exportação ---
-    tamanho_emoji = int(65 * escala)
-    tamanho_feedback = int(48 * escala)
-    try:
-        # Tenta carregar a fonte incluída no pacote .exe
-        caminho_fonte = resource_path("DejaVuSans.ttf")
-        fonte_para_emojis = pygame.font.Font(caminho_fonte, tamanho_emoji)
-        fonte_feedback = pygame.font.Font(caminho_fonte, tamanho_feedback)
-    except (FileNotFoundError, pygame.error):
-        # Se falhar, usa a fonte padrão do Pygame (sem emojis)
-        print("Aviso: Fonte 'DejaVuSans.ttf' não encontrada. Usando fonte padrão.")
-        fonte_para_emojis = pygame.font.Font(None, tamanho_emoji)
-        fonte_feedback = pygame.font.Font(None, tamanho_feedback)
-
-    fonte_titulo = pygame.font.Font(None, int(95 * escala))
-    fonte_grande = pygame.font.Font(None, int(200 * escala))
-    fonte_media = pygame.font.Font(None, int(65 * escala))
-    fonte_pequena = pygame.font.Font(None, int(48 * escala))
-    fonte_botao = pygame.font.Font(None, int(55 * escala))
-    fonte_creditos = pygame.font.Font(None, int(28 * escala))
+    fundo = obter_fundo(LARGURA_TELA, ALTURA_TELA, previa)
+    carregar_fontes(escala_fontes)
 
 
     rect_w, rect_h = int(450 * escala), int(75 * escala)
@@ -202,100 +554,707 @@ def atualizar_elementos_escala(largura, altura):
 atualizar_elementos_escala(LARGURA_TELA, ALTURA_TELA)
 relogio = pygame.time.Clock()
 
+# --- RITMO DE SIMULAÇÃO E DE DESENHO ---
+# A simulação (partículas, letras do menu) avança em passos fixos; o desenho interpola entre eles.
+PASSO_SIMULACAO_MS = 1000 / 60
+MAXIMO_ATRASO_MS = 250  # depois de uma pausa longa não tenta recuperar mais do que isto
+FPS_OCIOSO = 30         # menu só com as letras de fundo a flutuar
+ESPERA_MAXIMA_MS = 1000 # sem nada a animar, dorme à espera de eventos até este tempo
+
+def fps_alvo():
+    if args.benchmark: return 0  # no benchmark mede-se o custo real de cada quadro
+    if args.fps is not None: return args.fps
+    # Só o pygame-ce sabe a taxa do monitor; no pygame 2.6 fica o valor fixo de 60.
+    taxas = getattr(pygame.display, "get_desktop_refresh_rates", lambda: [])()
+    return (taxas[0] if taxas else 0) or 60
+
+FPS_ALVO = fps_alvo()
+
+def receber_asset(nome, valor):
+    """Troca o substituto pelo asset real assim que o carregador o entrega."""
+    global fundo_original, fundo, fundo_previa, dados_fonte_ttf, versao_visual, tempo_assets_prontos_ms
+    if nome == "fundo" and valor:
+        with trava_desenho:
+            # A imagem do pacote já está no formato do ecrã; convert() só a copiaria para fora do mmap
+            fundo_original = valor if no_pacote("fundo.png") else valor.convert()
+            fundo_previa = None
+            cache_fundos.limpar()
+            fundo = obter_fundo(LARGURA_TELA, ALTURA_TELA); versao_visual += 1
+    elif nome == "fonte":
+        if valor is None:
+            print("Aviso: Fonte 'DejaVuSans.ttf' não encontrada. Usando fonte padrão.")
+        else:
+            with trava_desenho:
+                dados_fonte_ttf = valor
+                carregar_fontes(ALTURA_TELA / BASE_ALTURA)
+    elif nome.startswith("som_") and valor:
+        audio.instalar(nome[len("som_"):], valor)
+    elif nome == "musica":
+        try:
+            if valor is None: raise pygame.error
+            audio.tocar_musica(valor)
+        except pygame.error:
+            print("Aviso: 'musica_fundo.mp3' não encontrada.")
+    if not carregador.carregando: tempo_assets_prontos_ms = (time.perf_counter() - INICIO_PROCESSO) * 1000
+
+def mostrar_tempos_carregamento():
+    """Com --tempos-carregamento, uma vez, quando já há primeiro quadro e todos os assets chegaram."""
+    global tempos_carregamento_pendentes
+    if not tempos_carregamento_pendentes or tempo_primeiro_quadro_ms is None or tempo_assets_prontos_ms is None: return
+    tempos_carregamento_pendentes = False
+    print("Tempos de carregamento (ms):", ", ".join(f"{n}={t:.1f}" for n, t in carregador.tempos.items()))
+    print(f"Primeiro quadro: {tempo_primeiro_quadro_ms:.1f} ms; assets prontos: {tempo_assets_prontos_ms:.1f} ms")
+
 # --- DADOS DO JOGO ---
-letras_numeros = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, 'H': 8, 'I': 9, 'J': 10, 'K': 11, 'L': 12, 'M': 13, 'N': 14, 'O': 15, 'P': 16, 'Q': 17, 'R': 18, 'S': 19, 'T': 20, 'U': 21, 'V': 22, 'W': 23, 'X': 24, 'Y': 25, 'Z': 26}
-todas_letras = list(letras_numeros.keys())
+# As regras (letras, pontuação, vidas, níveis) ficam em logica.py; aqui só a apresentação
 
 mensagens_acerto = ["Acertou! :D", "Parabéns! :P", "Excelente! :]", "Correto! ☆", "Perfeito! :)", "Acertou em cheio!", "Magnífico! O_O", "Sem erros por aqui!", "Cravou ;)", "Impressionante!", "Mandou bem!", "Que precisão! 10/10", "Arrasou!", "Resposta exata!", "Brilhante! ☆"]
 mensagens_erro_perto = ["Errado! Foi por pouco... :(", "Quase lá! Tente de novo."]
 mensagens_erro_medio = ["Errado! Esta no caminho certo.", "Não foi dessa vez, mais uma!"]
 mensagens_erro_longe = ["Errado! Um pouco longe...:L", "Hmm, a resposta e outra."]
-recorde_atual = carregar_recorde()
+mensagens_erro = {"perto": mensagens_erro_perto, "medio": mensagens_erro_medio, "longe": mensagens_erro_longe}
+titulos_bonus = {100: "LEGENDÁRIO", 50: "INCRÍVEL", 25: "ESPETACULAR"}
+# Reproduções e benchmarks não são partidas do jogador: não leem nem gravam o recorde (a
+# reprodução começa sempre do zero, seja qual for o recorde desta máquina) nem o histórico
+sessao_isolada = bool(args.benchmark or leitor_entrada)
+recorde_atual = 0 if sessao_isolada else carregar_recorde()
+
+# --- HISTÓRICO DE RESPOSTAS ---
+# Cada resposta vai para historico.db (ver registro.py); a gravação é feita noutra thread.
+registro = RegistroNulo() if sessao_isolada or args.sem_historico else abrir_registro()
+partida_registro = 0
+momento_letra = None  # perf_counter do primeiro quadro em que a letra atual apareceu
 
 # --- FUNÇÕES AUXILIARES ---
+def renderizar_texto(texto, fonte, cor, scale=1.0):
+    """Devolve a superfície do texto, reaproveitando a do cache quando possível."""
+    escala = round(scale, 2)
+    chave = (texto, id(fonte), cor, escala)
+    textobj = cache_texto.obter(chave)
+    if textobj is None:
+        textobj = fonte.render(texto, True, cor)
+        if escala != 1.0:
+            orig_w, orig_h = textobj.get_size()
+            if orig_w > 0 and orig_h > 0:
+                textobj = pygame.transform.smoothscale(textobj, (int(orig_w * escala), int(orig_h * escala)))
+        cache_texto.guardar(chave, textobj)
+    return textobj
+
 def desenhar_texto(texto, fonte, cor, superficie, x, y, align="center", scale=1.0):
-    textobj = fonte.render(texto, True, cor)
-    if scale != 1.0:
-        orig_w, orig_h = textobj.get_size()
-        if orig_w > 0 and orig_h > 0:
-            textobj = pygame.transform.smoothscale(textobj, (int(orig_w * scale), int(orig_h * scale)))
+    inicio = profiler.relogio()
+    textobj = renderizar_texto(texto, fonte, cor, scale)
     textrect = textobj.get_rect()
     if align == "center": textrect.center = (x, y)
     elif align == "topleft": textrect.topleft = (x, y)
     elif align == "topright": textrect.topright = (x, y)
-    superficie.blit(textobj, textrect)
+    area = superficie.blit(textobj, textrect)
+    profiler.acumular("texto", inicio)
+    return area
+
+def quebrar_linhas(texto, fonte, largura):
+    """Divide o texto em linhas que cabem na largura dada (resultado guardado em cache)."""
+    chave = (texto, id(fonte), largura)
+    linhas = cache_quebra.obter(chave)
+    if linhas is None:
+        palavras = texto.split(' '); linhas, linha_atual = [], ""
+        for palavra in palavras:
+            teste_linha = linha_atual + palavra + " "
+            if fonte.size(teste_linha)[0] < largura: linha_atual = teste_linha
+            else: linhas.append(linha_atual); linha_atual = palavra + " "
+        linhas.append(linha_atual)
+        linhas = tuple(linhas)
+        cache_quebra.guardar(chave, linhas)
+    return linhas
 
 def desenhar_texto_com_quebra(texto, fonte, cor, superficie, rect):
-    palavras = texto.split(' '); linhas, linha_atual = [], ""
-    for palavra in palavras:
-        teste_linha = linha_atual + palavra + " "
-        if fonte.size(teste_linha)[0] < rect.width: linha_atual = teste_linha
-        else: linhas.append(linha_atual); linha_atual = palavra + " "
-    linhas.append(linha_atual)
-    y = rect.top
-    for linha in linhas:
-        text_surf = fonte.render(linha, True, cor)
+    inicio = profiler.relogio()
+    y = rect.top; rects = []
+    for linha in quebrar_linhas(texto, fonte, rect.width):
+        text_surf = renderizar_texto(linha, fonte, cor)
         text_rect = text_surf.get_rect(centerx=rect.centerx, top=y)
-        superficie.blit(text_surf, text_rect)
+        rects.append(superficie.blit(text_surf, text_rect))
         y += fonte.get_linesize()
+    profiler.acumular("texto", inicio)
+    return rects[0].unionall(rects[1:])
+
+# --- ANIMAÇÕES ---
+DURACAO_FADE_MS = 170
+DURACAO_TREMOR_MS = 250
+AMPLITUDE_TREMOR = 8
+
+class Efeitos:
+    """Valores animados pelo agendador e lidos pelo desenho."""
+    __slots__ = ("letra_escala", "fade_alpha", "tremor")
+
+    def __init__(self):
+        self.letra_escala, self.fade_alpha, self.tremor = 1.0, 0.0, 0.0
+
+efeitos = Efeitos()
+agendador = Agendador()
 
-def fade_out_transicao():
-    fade_surface = pygame.Surface((LARGURA_TELA, ALTURA_TELA)); fade_surface.fill(PRETO)
-    for alpha in range(0, 255, 15):
-        fade_surface.set_alpha(alpha); tela.blit(fade_surface, (0, 0))
-        pygame.display.flip(); pygame.time.delay(10)
+def criar_superficie_fade(tamanho):
+    superficie = pygame.Surface(tamanho).convert(); superficie.fill(PRETO)
+    return superficie
+
+def jogar_localmente(erro):
+    """Perdida a ligação ao servidor, esta e as próximas partidas correm localmente."""
+    global partida
+    print(f"Aviso: ligação ao servidor {args.servidor} perdida, a jogar localmente ({erro}).")
+    partida.fechar()
+    partida = Partida(rng_partida, baralho)
+
+def iniciar_partida():
+    """Começa a partida já e revela-a com um fade a partir do preto, sem bloquear a entrada."""
+    try: resetar_jogo()
+    except (OSError, ErroProtocolo) as e:
+        jogar_localmente(e); resetar_jogo()
+    agendador.animar(efeitos, "fade_alpha", 255, 0, DURACAO_FADE_MS, ease_in_out_quad, chave="fade")
+
+def iniciar_tremor():
+    agendador.animar(efeitos, "tremor", AMPLITUDE_TREMOR, 0, DURACAO_TREMOR_MS, chave="tremor")
 
 def resetar_jogo():
-    global pontuacao, vidas, acertos_consecutivos, letras_erradas_info, dificuldade_mantida, nivel_atual_exibido
-    global letra_sorteada, numero_correto, input_usuario, feedback, feedback_cor, estado_jogo, recorde_atual
-    global ultimo_feedback, historico_letras, particulas, shake_timer, letra_escala, animacao_letra_ativa
-    pontuacao, vidas, acertos_consecutivos = 0, 3, 0
-    letras_erradas_info = []
-    dificuldade_mantida, nivel_atual_exibido = 0, -1
+    global nivel_atual_exibido, input_usuario, feedback, feedback_cor, estado_jogo
+    global ultimo_feedback, novo_recorde, partida_registro
+    partida.reiniciar()
+    partida_registro = registro.iniciar_partida()
+    novo_recorde = False
+    nivel_atual_exibido = -1
     input_usuario, feedback, feedback_cor = "", "", BRANCO
-    ultimo_feedback = ""; historico_letras = []; particulas = []
-    shake_timer = 0; letra_escala = 0.1; animacao_letra_ativa = True
+    ultimo_feedback = ""; particulas.limpar()
+    agendador.cancelar("tremor"); efeitos.tremor = 0
     estado_jogo = "jogando"
-    recorde_atual = carregar_recorde()
-    letra_sorteada, numero_correto = sortear_nova_letra()
-
-def sortear_nova_letra():
-    global historico_letras, letra_escala, animacao_letra_ativa
-    if dificuldade_mantida == 0: letras_disponiveis = todas_letras[:10]
-    elif dificuldade_mantida == 1: letras_disponiveis = todas_letras[:15]
-    else: letras_disponiveis = todas_letras
-    pool_de_letras = [letra for letra in letras_disponiveis if letra not in historico_letras]
-    if not pool_de_letras: pool_de_letras = letras_disponiveis
-    nova_letra = random.choice(pool_de_letras)
-    historico_letras.append(nova_letra)
-    if len(historico_letras) > 5:
-        historico_letras.pop(0)
-    letra_escala = 0.1
-    animacao_letra_ativa = True
-    return nova_letra, letras_numeros[nova_letra]
+    reiniciar_animacao_letra()
+
+def reiniciar_animacao_letra():
+    global momento_letra
+    momento_letra = None  # a latência da nova letra conta a partir do quadro em que aparece
+    # Cresce um pouco além do tamanho final e assenta
+    agendador.animar(efeitos, "letra_escala", 0.1, 1.1, 140, ease_out_quad, chave="letra").em_seguida(
+        efeitos, "letra_escala", 1.1, 1.0, 60, ease_in_out_quad)
+
+def escolher_mensagem(lista):
+    """Sorteia uma mensagem diferente da última mostrada."""
+    global ultimo_feedback
+    nova_mensagem = rng_mensagens.choice(lista)
+    while len(lista) > 1 and nova_mensagem == ultimo_feedback: nova_mensagem = rng_mensagens.choice(lista)
+    ultimo_feedback = nova_mensagem
+    return nova_mensagem
+
+# --- DESENHO DOS ESTADOS ---
+# Cada estado separa o que é estático (pode ficar guardado numa camada) do que muda a cada quadro.
+# As funções dinâmicas devolvem os retângulos que desenharam. O estado do jogo chega ao desenho só
+# através da foto (ver FotoEstado), nunca lido diretamente das variáveis globais: assim o desenho
+# pode correr noutra thread enquanto a lógica já avança. Layout, fontes e fundo são globais
+# protegidos pela trava_desenho.
+def sem_desenho(superficie, foto):
+    return []
+
+def desenhar_creditos(superficie):
+    margem_creditos = ALTURA_TELA * 0.04
+    return desenhar_texto("Por: Lucas N :)", fonte_creditos, CINZA_CLARO, superficie, LARGURA_TELA - margem_creditos, ALTURA_TELA - margem_creditos, align="topright")
+
+def criar_overlay(tamanho):
+    overlay = pygame.Surface(tamanho, pygame.SRCALPHA); overlay.fill((0, 0, 0, 180))
+    return overlay
+
+def desenhar_overlay(superficie):
+    superficie.blit(pool_superficies.obter("overlay", criar_overlay), (0, 0))
+
+def desenhar_botao(superficie, rect, cor, texto, fonte, deslocamento_y=0):
+    area = pygame.draw.rect(superficie, cor, rect, border_radius=int(rect.width / 2))
+    return area.union(desenhar_texto(texto, fonte, BRANCO, superficie, rect.centerx, rect.centery + deslocamento_y))
+
+def desenhar_menu_letras(superficie, foto):
+    for letra in foto.letras:
+        # O glifo é partilhado pelo atlas: só o alpha muda antes de cada blit
+        letra.glifo.set_alpha(letra.alpha)
+        superficie.blit(letra.glifo, posicao_letra(letra, foto.alpha))
+
+def areas_menu_letras(foto):
+    areas = []
+    for letra in foto.letras:
+        x, y = posicao_letra(letra, foto.alpha)
+        areas.append(letra.glifo.get_rect(topleft=(int(x), int(y))))
+    return areas
+
+def desenhar_menu_frente(superficie, foto):
+    desenhar_texto("Adivinhe o Número da Letra", fonte_titulo, BRANCO, superficie, LARGURA_TELA / 2, ALTURA_TELA / 4)
+    desenhar_texto(f"RECORDE: {foto.recorde}", fonte_media, AMARELO, superficie, LARGURA_TELA / 2, ALTURA_TELA * 0.4)
+    desenhar_texto("Pressione ESPAÇO para começar", fonte_media, AZUL, superficie, LARGURA_TELA / 2, ALTURA_TELA * 0.55)
+    desenhar_texto("Digite o número da letra e pressione Enter.", fonte_pequena, CINZA_CLARO, superficie, LARGURA_TELA / 2, ALTURA_TELA * 0.7)
+    if foto.carregando:
+        desenhar_texto("Carregando...", fonte_creditos, CINZA_CLARO, superficie, LARGURA_TELA / 2, ALTURA_TELA * 0.9)
+
+def desenhar_menu_dinamico(superficie, foto):
+    cor_settings_botao = CINZA_CLARO if settings_button_menu_rect.collidepoint(foto.mouse_pos) else CINZA_ESCURO
+    return [desenhar_botao(superficie, settings_button_menu_rect, cor_settings_botao, "⚙️", fonte_para_emojis)]
+
+def desenhar_jogando_estatico(superficie, foto):
+    pygame.draw.rect(superficie, CINZA_CLARO, input_rect_dims['rect'], input_rect_dims['border'], border_radius=input_rect_dims['radius'])
+
+def desenhar_jogando_dinamico(superficie, foto):
+    margem = ALTURA_TELA * 0.05
+    cor_reset_botao = VERMELHO_BRILHANTE if reset_button_rect.collidepoint(foto.mouse_pos) else VERMELHO_VINHO
+    cor_settings_botao = CINZA_CLARO if settings_button_rect.collidepoint(foto.mouse_pos) else CINZA_ESCURO
+    feedback_rect = pygame.Rect(LARGURA_TELA * 0.1, ALTURA_TELA * 0.65, LARGURA_TELA * 0.8, ALTURA_TELA * 0.2)
+    return [
+        desenhar_texto(f"Pontuação: {foto.pontuacao}", fonte_media, AMARELO, superficie, margem, margem, align="topleft"),
+        desenhar_texto(f"Vidas: {'❤️' * foto.vidas}", fonte_para_emojis, VERMELHO, superficie, LARGURA_TELA - margem, margem, align="topright"),
+        desenhar_botao(superficie, reset_button_rect, cor_reset_botao, "X", fonte_botao, 3 * (ALTURA_TELA/BASE_ALTURA)),
+        desenhar_botao(superficie, settings_button_rect, cor_settings_botao, "⚙️", fonte_para_emojis),
+        desenhar_texto(foto.letra, fonte_grande, AZUL, superficie, LARGURA_TELA / 2, ALTURA_TELA / 3, scale=foto.letra_escala),
+        desenhar_texto(foto.input_usuario, fonte_media, BRANCO, superficie, LARGURA_TELA / 2, ALTURA_TELA / 2 + input_rect_dims['rect'][3] / 2),
+        desenhar_texto_com_quebra(foto.feedback, fonte_feedback, foto.feedback_cor, superficie, feedback_rect),
+    ]
+
+def desenhar_confirmando_reset_estatico(superficie, foto):
+    # A partida fica congelada por baixo do overlay, então entra inteira na camada estática
+    desenhar_jogando_estatico(superficie, foto); desenhar_jogando_dinamico(superficie, foto)
+    desenhar_overlay(superficie)
+    desenhar_texto("Voltar ao Menu Principal?", fonte_titulo, AMARELO, superficie, LARGURA_TELA / 2, ALTURA_TELA / 3)
+    desenhar_texto("Todo o progresso da partida será perdido.", fonte_pequena, CINZA_CLARO, superficie, LARGURA_TELA / 2, ALTURA_TELA * 0.5)
+    desenhar_texto("Pressione [S] para confirmar ou [N] para cancelar", fonte_media, BRANCO, superficie, LARGURA_TELA / 2, ALTURA_TELA * 0.65)
+
+def desenhar_confirmando_dificuldade_estatico(superficie, foto):
+    nome_nivel, descricao_nivel = foto.proximo_nivel
+    desenhar_overlay(superficie)
+    desenhar_texto("NOVO NÍVEL!", fonte_titulo, AMARELO, superficie, LARGURA_TELA / 2, ALTURA_TELA / 3)
+    desenhar_texto(f"Dificuldade aumentada para {nome_nivel} ({descricao_nivel})", fonte_media, BRANCO, superficie, LARGURA_TELA / 2, ALTURA_TELA * 0.5)
+    desenhar_texto("Pressione [S] para continuar ou [N] para voltar ao menu", fonte_pequena, AMARELO, superficie, LARGURA_TELA / 2, ALTURA_TELA * 0.75)
+
+def desenhar_settings_estatico(superficie, foto):
+    desenhar_overlay(superficie)
+    pygame.draw.rect(superficie, PRETO, (LARGURA_TELA * 0.2, ALTURA_TELA * 0.2, LARGURA_TELA * 0.6, ALTURA_TELA * 0.6), border_radius=20)
+    pygame.draw.rect(superficie, AZUL, (LARGURA_TELA * 0.2, ALTURA_TELA * 0.2, LARGURA_TELA * 0.6, ALTURA_TELA * 0.6), 5, border_radius=20)
+    desenhar_texto("Configurações de Áudio", fonte_media, BRANCO, superficie, LARGURA_TELA / 2, ALTURA_TELA * 0.25)
+    desenhar_texto("Música", fonte_pequena, BRANCO, superficie, LARGURA_TELA/2, music_slider_rect.y - 30)
+    pygame.draw.rect(superficie, CINZA_ESCURO, music_slider_rect, border_radius=10)
+    desenhar_texto("Efeitos Sonoros", fonte_pequena, BRANCO, superficie, LARGURA_TELA/2, sfx_slider_rect.y - 30)
+    pygame.draw.rect(superficie, CINZA_ESCURO, sfx_slider_rect, border_radius=10)
+
+def area_puxador(slider_rect, handle_rect, volume):
+    """Onde fica o puxador de um slider para o volume dado (o clique e o desenho usam o mesmo cálculo)."""
+    puxador = handle_rect.copy()
+    puxador.center = (slider_rect.left + slider_rect.width * volume, slider_rect.centery)
+    return puxador
+
+def desenhar_settings_dinamico(superficie, foto):
+    cor_close_botao = VERMELHO_BRILHANTE if settings_close_button_rect.collidepoint(foto.mouse_pos) else VERMELHO_VINHO
+    return [
+        pygame.draw.rect(superficie, AZUL, area_puxador(music_slider_rect, music_handle_rect, foto.volume_musica), border_radius=8),
+        pygame.draw.rect(superficie, AZUL, area_puxador(sfx_slider_rect, sfx_handle_rect, foto.volume_sfx), border_radius=8),
+        desenhar_botao(superficie, settings_close_button_rect, cor_close_botao, "X", fonte_botao, 3 * (ALTURA_TELA/BASE_ALTURA)),
+    ]
+
+def desenhar_fim_de_jogo_estatico(superficie, foto):
+    if foto.novo_recorde:
+        desenhar_texto("NOVO RECORDE!", fonte_titulo, AMARELO, superficie, LARGURA_TELA / 2, ALTURA_TELA / 4)
+    else:
+        desenhar_texto("FIM DE JOGO", fonte_titulo, VERMELHO, superficie, LARGURA_TELA / 2, ALTURA_TELA / 4)
+    desenhar_texto(f"Pontuação Final: {foto.pontuacao}", fonte_media, BRANCO, superficie, LARGURA_TELA / 2, ALTURA_TELA / 2)
+    if foto.letras_erradas:
+        desenhar_texto("Respostas corretas:", fonte_pequena, CINZA_CLARO, superficie, LARGURA_TELA / 2, ALTURA_TELA * 0.60)
+        pos_y = ALTURA_TELA * 0.65
+        texto_erradas = ", ".join([f"{letra} = {num}" for letra, num in foto.letras_erradas])
+        desenhar_texto(texto_erradas, fonte_pequena, BRANCO, superficie, LARGURA_TELA / 2, pos_y)
+    desenhar_texto("Pressione ESPAÇO para jogar novamente", fonte_media, AMARELO, superficie, LARGURA_TELA / 2, ALTURA_TELA * 0.77)
+
+class CamadaEstado:
+    """Como desenhar um estado: estático (abaixo), animado, frente estática e dinâmico (acima).
+
+    Todas recebem a foto do estado. `assinatura(foto)` devolve os valores de que a parte estática
+    depende; se mudarem, a camada é refeita. `areas_animadas(foto)` diz onde o `animado` vai desenhar.
+    """
+    __slots__ = ("assinatura", "estatico", "animado", "areas_animadas", "frente", "dinamico")
+
+    def __init__(self, assinatura, estatico=sem_desenho, dinamico=sem_desenho, animado=None, areas_animadas=None, frente=None):
+        self.assinatura, self.estatico, self.dinamico = assinatura, estatico, dinamico
+        self.animado, self.areas_animadas, self.frente = animado, areas_animadas, frente
+
+CAMADAS = {
+    "menu": CamadaEstado(lambda foto: (foto.recorde, foto.carregando), animado=desenhar_menu_letras, areas_animadas=areas_menu_letras, frente=desenhar_menu_frente, dinamico=desenhar_menu_dinamico),
+    "jogando": CamadaEstado(lambda foto: (), desenhar_jogando_estatico, desenhar_jogando_dinamico),
+    "confirmando_reset": CamadaEstado(
+        lambda foto: (foto.pontuacao, foto.vidas, foto.letra, foto.letra_escala, foto.input_usuario, foto.feedback, foto.feedback_cor,
+                      reset_button_rect.collidepoint(foto.mouse_pos), settings_button_rect.collidepoint(foto.mouse_pos)),
+        desenhar_confirmando_reset_estatico),
+    "confirmando_dificuldade": CamadaEstado(lambda foto: foto.proximo_nivel, desenhar_confirmando_dificuldade_estatico),
+    "settings": CamadaEstado(lambda foto: (), desenhar_settings_estatico, desenhar_settings_dinamico),
+    "fim_de_jogo": CamadaEstado(lambda foto: (foto.pontuacao, foto.novo_recorde, len(foto.letras_erradas)), desenhar_fim_de_jogo_estatico),
+}
+
+def atualizar_hud_perfil(foto):
+    relogio_quadros = thread_desenho.relogio if thread_desenho else relogio
+    linhas_hud_perfil[:] = [f"FPS {relogio_quadros.get_fps():.0f} ({foto.modo})   (p50 / p95 / p99 ms)"]
+    for nome in ("quadro",) + FASES + ("texto", "particulas"):
+        p50, p95, p99 = profiler.percentis(nome)
+        linhas_hud_perfil.append(f"{nome:<13}{p50:6.2f} {p95:6.2f} {p99:6.2f}")
+    for nome, contador in (("entr.→lógica", latencia_logica), ("entr.→ecrã", latencia_ecra)):
+        p50, p95, p99 = contador.percentis()
+        linhas_hud_perfil.append(f"{nome:<13}{p50:6.2f} {p95:6.2f} {p99:6.2f}")
+    quantidade_particulas = len(foto.particulas.vida) if foto.particulas else 0
+    linhas_hud_perfil.append(f"cache texto {cache_texto.taxa_acerto():.0%}  quebra {cache_quebra.taxa_acerto():.0%}  partículas {quantidade_particulas}")
+
+def desenhar_sobreposicoes(superficie, foto):
+    """Fade de transição e painel do profiler, por cima de tudo; devolve os retângulos desenhados."""
+    rects = []
+    if foto.fade_alpha > 0:
+        fade_surface = pool_superficies.obter("fade", criar_superficie_fade)
+        fade_surface.set_alpha(int(foto.fade_alpha))
+        rects.append(superficie.blit(fade_surface, (0, 0)))
+    if not (hud_perfil_visivel and profiler.ativo): return rects
+    if not linhas_hud_perfil or profiler.numero_quadro % 30 == 0: atualizar_hud_perfil(foto)
+    fonte_hud = obter_fonte(20, dejavu=True)
+    altura_linha = fonte_hud.get_linesize()
+    largura = max(fonte_hud.size(linha)[0] for linha in linhas_hud_perfil) + 16
+    area = pygame.draw.rect(superficie, PRETO, (8, 8, largura, altura_linha * len(linhas_hud_perfil) + 12))
+    for i, linha in enumerate(linhas_hud_perfil):
+        desenhar_texto(linha, fonte_hud, VERDE, superficie, 16, 14 + i * altura_linha, align="topleft")
+    return rects + [area]
+
+def desenhar_quadro_completo(superficie, foto):
+    """Desenha o quadro inteiro, sem cache (modo normal, quadros de tremor e thread de desenho)."""
+    camada = CAMADAS[foto.estado]
+    if fundo: superficie.blit(fundo, (0, 0))
+    else: superficie.fill(PRETO)
+    camada.estatico(superficie, foto)
+    if camada.animado: camada.animado(superficie, foto)
+    if camada.frente: camada.frente(superficie, foto)
+    desenhar_creditos(superficie)
+    camada.dinamico(superficie, foto)
+    particulas.draw(superficie, foto.particulas, foto.alpha)
+    desenhar_sobreposicoes(superficie, foto)
+    # O tremor desloca o quadro já desenhado na própria superfície, sem copiar o framebuffer
+    amplitude_tremor = round(foto.tremor)
+    if amplitude_tremor:
+        superficie.scroll(rng_tremor.randint(-amplitude_tremor, amplitude_tremor), rng_tremor.randint(-amplitude_tremor, amplitude_tremor))
+
+def criar_superficie_opaca(tamanho):
+    return pygame.Surface(tamanho).convert()
+
+def fundir_retangulos(rects):
+    """Junta retângulos sobrepostos até não haver sobreposição entre eles."""
+    fundidos = []
+    for r in rects:
+        r = pygame.Rect(r)
+        i = r.collidelist(fundidos)
+        while i != -1:
+            r.union_ip(fundidos.pop(i)); i = r.collidelist(fundidos)
+        fundidos.append(r)
+    return fundidos
+
+class RenderizadorRetangulosSujos:
+    """Compõe a parte estática de cada estado uma vez e envia ao ecrã só as regiões alteradas."""
+    def __init__(self):
+        self.chave = None
+        self.base = None
+        self.sujos = None  # None obriga a um flip completo no próximo quadro
+
+    def invalidar(self):
+        self.sujos = None
+
+    def _compor(self, camada, foto):
+        self.base = pool_superficies.obter("camada_base", criar_superficie_opaca)
+        if fundo: self.base.blit(fundo, (0, 0))
+        else: self.base.fill(PRETO)
+        camada.estatico(self.base, foto)
+        if not camada.frente: desenhar_creditos(self.base)
+
+    def desenhar(self, foto):
+        camada = CAMADAS[foto.estado]
+        chave = (foto.estado, LARGURA_TELA, ALTURA_TELA, versao_visual, camada.assinatura(foto))
+        if chave != self.chave:
+            self._compor(camada, foto); self.chave = chave; self.sujos = None
+
+        completo = self.sujos is None
+        areas_animadas = camada.areas_animadas(foto) if camada.animado else []
+        if completo:
+            tela.blit(self.base, (0, 0)); restaurar = []
+            if camada.animado:
+                camada.animado(tela, foto); camada.frente(tela, foto); desenhar_creditos(tela)
+        elif camada.animado:
+            # Cada região é recomposta inteira (base, animações, frente) recortada, uma única vez,
+            # para o antialiasing da frente não ser misturado duas vezes onde as regiões se tocam
+            restaurar = fundir_retangulos(self.sujos + areas_animadas)
+            for r in restaurar:
+                tela.set_clip(r); tela.blit(self.base, r, r)
+                camada.animado(tela, foto); camada.frente(tela, foto); desenhar_creditos(tela)
+            tela.set_clip(None)
+        else:
+            restaurar = self.sujos
+            for r in restaurar: tela.blit(self.base, r, r)
+        novos = camada.dinamico(tela, foto)
+        area_particulas = particulas.draw(tela, foto.particulas, foto.alpha)
+        if area_particulas: novos.append(area_particulas)
+        novos += desenhar_sobreposicoes(tela, foto)
+
+        profiler.fase("apresentacao")
+        if completo: pygame.display.flip()
+        else: pygame.display.update(restaurar + novos)
+        # As animações também ficam para restaurar no próximo quadro: uma letra que ande mais do que
+        # o próprio tamanho (um dt grande) deixava rasto onde estava
+        self.sujos = novos + areas_animadas
+
+# --- FOTOS DO ESTADO E DESENHO NUMA THREAD À PARTE ---
+# Tudo o que o desenho lê do jogo, copiado no fim de cada passo da lógica. Uma foto nunca muda
+# depois de criada: a lógica pode avançar enquanto outra thread desenha a anterior.
+FotoEstado = namedtuple("FotoEstado", (
+    "estado", "pontuacao", "vidas", "letra", "letras_erradas", "input_usuario", "feedback", "feedback_cor",
+    "mouse_pos", "recorde", "novo_recorde", "carregando", "proximo_nivel", "volume_musica", "volume_sfx",
+    "letra_escala", "fade_alpha", "tremor", "letras", "particulas", "alpha", "modo",
+    "entradas",  # perf_counter de cada entrada (tecla, clique) tratada desde a foto anterior
+))
+TIPOS_ENTRADA = (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN)
+TAXA_LOGICA_HZ = 120  # com --desenho-em-thread: passos de entrada e lógica por segundo
+INTERVALO_TROCA_GIL_S = 0.001
+
+# Layout, fontes, fundo e caches de texto pertencem ao desenho: a thread principal só os troca
+# (redimensionar, assets a chegar) com esta trava, que o desenho segura durante cada quadro
+trava_desenho = threading.Lock()
+
+def fotografar():
+    global entradas_pendentes
+    entradas, entradas_pendentes = tuple(entradas_pendentes), []
+    return FotoEstado(
+        estado_jogo, partida.pontuacao, partida.vidas, partida.letra_sorteada, tuple(partida.letras_erradas_info),
+        input_usuario, feedback, feedback_cor, mouse_pos, recorde_atual, novo_recorde, carregador.carregando,
+        (proximo_nome_nivel, proximo_descricao_nivel), volume_musica, volume_sfx,
+        efeitos.letra_escala, efeitos.fade_alpha, efeitos.tremor,
+        tuple(letra.foto() for letra in letras_flutuantes) if estado_jogo == "menu" else (),
+        particulas.fotografar(copiar=thread_desenho is not None), alpha_interpolacao, modo_desenho, entradas)
+
+def fps_do_modo(modo):
+    return FPS_OCIOSO if modo == "ambiente" else FPS_ALVO if modo == "animando" else 0
+
+def quadro_apresentado(foto):
+    """Depois de cada flip: as entradas que a foto já mostra chegaram ao ecrã."""
+    global tempo_primeiro_quadro_ms, quadros_apresentados
+    agora = time.perf_counter()
+    for momento in foto.entradas: latencia_ecra.registrar((agora - momento) * 1000)
+    quadros_apresentados += 1
+    if tempo_primeiro_quadro_ms is None: tempo_primeiro_quadro_ms = (agora - INICIO_PROCESSO) * 1000
+
+class BufferDuplo:
+    """Passa fotos da lógica para o desenho: a publicada (ainda por ler) e a que está a ser desenhada.
+
+    Publicar por cima de uma foto que o desenho não chegou a ler descarta-a, mas as entradas
+    dela passam para a nova, para a latência até ao ecrã continuar a ser contada. Cada foto
+    publicada leva um número (`numero`, sempre a subir).
+    """
+    def __init__(self):
+        self.condicao = threading.Condition()
+        self.publicada, self.fechado, self.numero = None, False, 0
+
+    def publicar(self, foto):
+        with self.condicao:
+            if self.publicada is not None and self.publicada.entradas:
+                foto = foto._replace(entradas=self.publicada.entradas + foto.entradas)
+            self.publicada = foto
+            self.numero += 1
+            self.condicao.notify()
+
+    def esperar(self):
+        """(foto, número) da mais recente, assim que houver uma por ler; (None, número) depois de `fechar`."""
+        with self.condicao:
+            while self.publicada is None and not self.fechado: self.condicao.wait()
+            foto, self.publicada = self.publicada, None
+            return foto, self.numero
+
+    def fechar(self):
+        with self.condicao:
+            self.fechado = True
+            self.condicao.notify()
+
+class ThreadDesenho:
+    """Desenha as fotos numa thread à parte; a thread principal fica com entrada, lógica e apresentação.
+
+    O SDL só aceita eventos e flip na thread principal, por isso cada quadro é composto numa de
+    duas superfícies fora do ecrã e a thread principal copia a que estiver pronta para o ecrã
+    enquanto espera pelo próximo passo da lógica. Se o desenho não acompanhar a lógica, as fotos
+    intermédias são saltadas.
+    """
+    def __init__(self):
+        self.fotos = BufferDuplo()
+        self.trava_quadros = threading.Lock()  # o quadro pronto não é reescrito enquanto é copiado
+        self.quadro_pronto = None              # (superfície, foto, número da foto)
+        self.apresentada = 0                   # número da última foto posta no ecrã
+        self.ha_quadro = threading.Event()
+        self.indice = 0
+        self.relogio = pygame.time.Clock()
+        self.thread = threading.Thread(target=self._desenhar, name="desenho", daemon=True)
+
+    def iniciar(self):
+        self.thread.start()
+
+    def publicar(self, foto):
+        self.fotos.publicar(foto)
+
+    @property
+    def em_dia(self):
+        """True se a última foto publicada já está no ecrã (a lógica pode dormir à espera de eventos)."""
+        return self.apresentada == self.fotos.numero
+
+    def _desenhar(self):
+        while True:
+            foto, numero = self.fotos.esperar()
+            if foto is None: return
+            inicio = profiler.relogio()
+            with trava_desenho:
+                superficie = pool_superficies.obter(f"quadro_{self.indice}", criar_superficie_opaca)
+                desenhar_quadro_completo(superficie, foto)
+            with self.trava_quadros:
+                self.quadro_pronto = (superficie, foto, numero)
+            self.indice ^= 1
+            self.ha_quadro.set()
+            profiler.acumular("desenho", inicio)  # a fase "desenho" passa a ser o tempo desta thread
+            self.relogio.tick(fps_do_modo(foto.modo))
+
+    def apresentar_ate(self, prazo):
+        """Na thread principal: até `prazo` (perf_counter), põe no ecrã cada quadro que ficar pronto."""
+        while self.ha_quadro.wait(max(0.0, prazo - time.perf_counter())):
+            self.ha_quadro.clear()
+            with self.trava_quadros:
+                if self.quadro_pronto is None: continue
+                superficie, foto, self.apresentada = self.quadro_pronto
+                self.quadro_pronto = None
+                profiler.fase("apresentacao")
+                tela.blit(superficie, (0, 0))
+            pygame.display.flip()
+            profiler.fase(None)
+            quadro_apresentado(foto)
+
+    def fechar(self):
+        self.fotos.fechar()
+        self.thread.join(timeout=1.0)
 
 # --- INICIALIZAÇÃO DAS VARIÁVEIS ---
 estado_jogo = "menu"
-pontuacao, vidas, acertos_consecutivos = 0, 3, 0
-letras_erradas_info, dificuldade_mantida, nivel_atual_exibido = [], 0, -1
-letra_sorteada, numero_correto, input_usuario, feedback, feedback_cor = "", 0, "", "", BRANCO
+baralho = None
+if args.baralho:
+    try: baralho = carregar_baralho(args.baralho)
+    except (OSError, ValueError) as e: print(f"Aviso: baralho não carregado, a usar as letras de A a Z ({e}).")
+if leitor_entrada and leitor_entrada.baralho != assinatura_baralho(baralho):
+    parser.error(f"{args.reproduzir} foi gravada com outro baralho; use o mesmo --baralho da gravação")
+partida = None
+if args.servidor and not (args.gravar or leitor_entrada):
+    try: partida = PartidaRemota(args.servidor)
+    except (OSError, ErroProtocolo) as e: print(f"Aviso: servidor {args.servidor} indisponível, a jogar localmente ({e}).")
+if partida is None: partida = Partida(rng_partida, baralho)
+nivel_atual_exibido = -1
+input_usuario, feedback, feedback_cor = "", "", BRANCO
 proximo_nome_nivel, proximo_descricao_nivel = "", ""
-ultimo_feedback, historico_letras = "", []
+ultimo_feedback = ""
 volume_musica, volume_sfx = 0.05, 1.0
+audio.volume_musica, audio.volume_sfx = volume_musica, volume_sfx
 dragging_music_handle, dragging_sfx_handle = False, False
-particulas, shake_timer, letra_escala, animacao_letra_ativa = [], 0, 1.0, False
-letras_flutuantes = [LetraFlutuante(LARGURA_TELA, ALTURA_TELA) for _ in range(15)]
+particulas = SistemaParticulas()
+tempo_jogo_ms, numero_quadro = 0, 0  # relógio do jogo: soma dos dt, igual na gravação e na reprodução
+letras_flutuantes = [LetraFlutuante(LARGURA_TELA, ALTURA_TELA) for _ in range(NUM_LETRAS_FLUTUANTES)]
+novo_recorde, mouse_pos = False, (0, 0)
+redimensionamento_pendente, momento_redimensionamento = None, 0
+tempo_primeiro_quadro_ms = None
+tempo_assets_prontos_ms = None
+tempos_carregamento_pendentes = args.tempos_carregamento
+dt_ms, acumulador_simulacao, alpha_interpolacao = 0, 0.0, 1.0
+modo_desenho = "animando"
+entradas_pendentes, quadros_apresentados = [], 0
+latencia_logica, latencia_ecra = ContadorLatencia(), ContadorLatencia()
+thread_desenho = None
+if args.desenho_em_thread and not reproducao_rapida:
+    thread_desenho = ThreadDesenho()
+    # A lógica espera pelo GIL no máximo isto enquanto a thread de desenho corre código Python
+    sys.setswitchinterval(INTERVALO_TROCA_GIL_S)
+    if args.retangulos_sujos: print("Aviso: --retangulos-sujos é ignorado com --desenho-em-thread.")
+renderizador = RenderizadorRetangulosSujos() if args.retangulos_sujos and not thread_desenho else None
+roteiro_benchmark = None
+if args.benchmark:
+    from benchmark import RoteiroBenchmark
+    roteiro_benchmark = RoteiroBenchmark(args.benchmark, args.benchmark_quadros, args.benchmark_memoria,
+                                         args.benchmark_dt, args.benchmark_verificar)
+
+def simular_passo():
+    particulas.update()
+    if estado_jogo == "menu":
+        for letra in letras_flutuantes:
+            letra.update(LARGURA_TELA, ALTURA_TELA)
+
+def escolher_modo_desenho():
+    """animando: FPS_ALVO; ambiente: FPS_OCIOSO; espera: dorme até chegar um evento."""
+    if (len(particulas) or agendador.ocupado or redimensionamento_pendente or carregador.carregando
+            or dragging_music_handle or dragging_sfx_handle or hud_perfil_visivel or roteiro_benchmark):
+        return "animando"
+    if estado_jogo == "menu": return "ambiente"
+    return "espera"
+
+def resumo_sessao():
+    """Estado no fim da sessão, guardado na gravação e conferido na reprodução."""
+    return {"quadros": numero_quadro, "tempo_jogo_ms": tempo_jogo_ms, "estado": estado_jogo, "pontuacao": partida.pontuacao,
+            "vidas": partida.vidas, "sequencia": partida.acertos_consecutivos, "nivel": partida.dificuldade_mantida,
+            "letra": partida.letra_sorteada}
+
+def conferir_reproducao(duracao_s):
+    """Compara o fim da reprodução com o da gravação; devolve False se divergiram."""
+    print(f"Reprodução: {numero_quadro} quadros em {duracao_s:.2f}s ({numero_quadro / max(duracao_s, 1e-9):.0f} quadros/s)")
+    if leitor_entrada.proximo_quadro() is not None or leitor_entrada.resumo is None:
+        print("Reprodução incompleta: nada a conferir."); return True
+    diferencas = {chave: (valor, leitor_entrada.resumo.get(chave)) for chave, valor in resumo_sessao().items() if valor != leitor_entrada.resumo.get(chave)}
+    for chave, (obtido, gravado) in diferencas.items(): print(f"DIVERGÊNCIA {chave}: gravado {gravado!r}, reproduzido {obtido!r}")
+    if not diferencas: print("A reprodução confere com a gravação.")
+    return not diferencas
+
+def obter_eventos():
+    # Com a thread de desenho, só depois de a última foto estar no ecrã
+    if modo_desenho == "espera" and (not thread_desenho or thread_desenho.em_dia):
+        primeiro = pygame.event.wait(ESPERA_MAXIMA_MS)
+        # O tempo a dormir não é tempo de jogo: sem isto o próximo dt incluía a espera e as
+        # animações que este evento começar (tremor, letra, fade) saltavam logo para o fim
+        relogio.tick()
+        eventos = pygame.event.get()
+        if primeiro.type != pygame.NOEVENT: eventos.insert(0, primeiro)
+        return eventos
+    return pygame.event.get()
+
+if args.gravar or leitor_entrada:
+    # Os assets chegam todos antes do primeiro quadro, para não dependerem da velocidade do disco
+    carregador.thread.join()
+    if args.gravar: gravador_entrada = GravadorEntrada(args.gravar, SEMENTE, (LARGURA_TELA, ALTURA_TELA), baralho)
 
 # --- LOOP PRINCIPAL DO JOGO ---
+# Com --desenho-em-thread (experimental) este loop só trata da entrada e da lógica, a TAXA_LOGICA_HZ,
+# publica uma foto por passo e, entre passos, apresenta os quadros que a thread de desenho for
+# terminando; sem nada a animar e com a última foto no ecrã, dorme à espera de eventos como o
+# loop normal.
 rodando = True
+inicio_loop = proximo_passo_logica = time.perf_counter()
+if thread_desenho: thread_desenho.iniciar()
 while rodando:
-    mouse_pos = pygame.mouse.get_pos()
+    profiler.novo_quadro(); profiler.fase("eventos")
+    if roteiro_benchmark: roteiro_benchmark.antes_do_quadro(sys.modules[__name__])
     # --- PROCESSAMENTO DE EVENTOS ---
-    for event in pygame.event.get():
+    if leitor_entrada:
+        quadro = leitor_entrada.proximo_quadro()
+        if quadro is None: break
+        dt_ms, mouse_pos, eventos = quadro
+        # Da janela real só conta o fechar; a entrada vem toda da gravação
+        if any(event.type == pygame.QUIT for event in pygame.event.get()): break
+        if not reproducao_rapida:  # ao ritmo original
+            atraso = (tempo_jogo_ms + dt_ms) / 1000 - (time.perf_counter() - inicio_loop)
+            if atraso > 0: time.sleep(atraso)
+    else:
+        eventos = obter_eventos()
+        mouse_pos = pygame.mouse.get_pos()
+        if gravador_entrada: gravador_entrada.quadro(dt_ms, mouse_pos, eventos)
+    momento_leitura = time.perf_counter()
+    tempo_jogo_ms += dt_ms; numero_quadro += 1
+    entradas_quadro = []
+    for event in eventos:
+        # A latência conta desde que a entrada foi lida (ou, se quem a injetou o disse, desde que aconteceu)
+        if event.type in TIPOS_ENTRADA: entradas_quadro.append(getattr(event, "momento", momento_leitura))
         if event.type == pygame.QUIT: rodando = False
         if event.type == pygame.VIDEORESIZE:
-            largura, altura = max(event.w, 640), max(event.h, 360)
-            atualizar_elementos_escala(largura, altura)
+            redimensionamento_pendente = (max(event.w, 640), max(event.h, 360))
+            momento_redimensionamento = tempo_jogo_ms
 
         if event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 1:
@@ -305,194 +1264,153 @@ while rodando:
                 elif estado_jogo == "menu":
                     if settings_button_menu_rect.collidepoint(event.pos): estado_jogo = "settings"
                 elif estado_jogo == "settings":
-                    if music_handle_rect.collidepoint(event.pos): dragging_music_handle = True
-                    if sfx_handle_rect.collidepoint(event.pos): dragging_sfx_handle = True
-                    if settings_close_button_rect.collidepoint(event.pos): estado_jogo = "jogando" if pontuacao > 0 or vidas < 3 else "menu"
+                    if area_puxador(music_slider_rect, music_handle_rect, volume_musica).collidepoint(event.pos): dragging_music_handle = True
+                    if area_puxador(sfx_slider_rect, sfx_handle_rect, volume_sfx).collidepoint(event.pos): dragging_sfx_handle = True
+                    if settings_close_button_rect.collidepoint(event.pos): estado_jogo = "jogando" if partida.iniciada else "menu"
 
         if event.type == pygame.MOUSEBUTTONUP:
             if event.button == 1: dragging_music_handle, dragging_sfx_handle = False, False
         
         if event.type == pygame.MOUSEMOTION:
             if dragging_music_handle:
-                music_handle_rect.centerx = max(music_slider_rect.left, min(event.pos[0], music_slider_rect.right))
-                volume_musica = (music_handle_rect.centerx - music_slider_rect.left) / music_slider_rect.width
-                pygame.mixer.music.set_volume(volume_musica)
+                x = max(music_slider_rect.left, min(event.pos[0], music_slider_rect.right))
+                volume_musica = (x - music_slider_rect.left) / music_slider_rect.width
+                audio.volume_musica = volume_musica  # chega ao mixer uma vez por quadro, na atualização
             if dragging_sfx_handle:
-                sfx_handle_rect.centerx = max(sfx_slider_rect.left, min(event.pos[0], sfx_slider_rect.right))
-                volume_sfx = (sfx_handle_rect.centerx - sfx_slider_rect.left) / sfx_slider_rect.width
-                if som_acerto: som_acerto.set_volume(volume_sfx)
-                if som_erro: som_erro.set_volume(volume_sfx)
+                x = max(sfx_slider_rect.left, min(event.pos[0], sfx_slider_rect.right))
+                volume_sfx = (x - sfx_slider_rect.left) / sfx_slider_rect.width
+                audio.volume_sfx = volume_sfx
+
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            if not profiler.ativo: profiler = ProfilerQuadros()
+            hud_perfil_visivel = not hud_perfil_visivel
+            if renderizador: renderizador.invalidar()
 
         if event.type == pygame.KEYDOWN:
             if estado_jogo == "jogando":
                 if event.key == pygame.K_RETURN:
                     try:
                         resposta = int(input_usuario)
-                        if resposta == numero_correto:
-                            acertos_consecutivos += 1; pontuacao += 1
-                            nova_mensagem = random.choice(mensagens_acerto)
-                            while len(mensagens_acerto) > 1 and nova_mensagem == ultimo_feedback: nova_mensagem = random.choice(mensagens_acerto)
-                            feedback, ultimo_feedback = nova_mensagem, nova_mensagem
+                        letra, nivel, sequencia = partida.letra_sorteada, partida.dificuldade_mantida, partida.acertos_consecutivos
+                        resultado = partida.responder(resposta)
+                        latencia_ms = (time.perf_counter() - momento_letra) * 1000 if momento_letra else 0
+                        registro.registrar(partida_registro, letra, resposta, resultado.correta, latencia_ms, nivel, sequencia)
+                        if resultado.correta:
+                            feedback = escolher_mensagem(mensagens_acerto)
                             feedback_cor = VERDE
-                            if som_acerto: som_acerto.play()
-                            for _ in range(30): particulas.append(Particula(LARGURA_TELA / 2, ALTURA_TELA / 3))
-                            if acertos_consecutivos > 0:
-                                if acertos_consecutivos % 100 == 0: pontuacao += 100; feedback = f" ☆ LEGENDÁRIO! +100 PONTOS!  ☆"
-                                elif acertos_consecutivos % 50 == 0: pontuacao += 50; feedback = f" ☆ INCRÍVEL! +50 PONTOS!  ☆"
-                                elif acertos_consecutivos % 25 == 0: pontuacao += 25; feedback = f" ☆ ESPETACULAR! +25 PONTOS!  ☆"
-                                elif acertos_consecutivos % 10 == 0: pontuacao += 10; feedback += f" +10 BÔNUS!"
-                                elif acertos_consecutivos % 5 == 0: pontuacao += 5; feedback += f" +5 BÔNUS!"
+                            audio.tocar("acerto")
+                            particulas.emitir(LARGURA_TELA / 2, ALTURA_TELA / 3, PARTICULAS_POR_ACERTO)
+                            if resultado.bonus in titulos_bonus: feedback = f" ☆ {titulos_bonus[resultado.bonus]}! +{resultado.bonus} PONTOS!  ☆"
+                            elif resultado.bonus: feedback += f" +{resultado.bonus} BÔNUS!"
                         else:
-                            vidas -= 1; shake_timer = 15
-                            diferenca = abs(resposta - numero_correto)
-                            if diferenca <= 2: lista_erros = mensagens_erro_perto
-                            elif diferenca <= 5: lista_erros = mensagens_erro_medio
-                            else: lista_erros = mensagens_erro_longe
-                            nova_mensagem = random.choice(lista_erros)
-                            while len(lista_erros) > 1 and nova_mensagem == ultimo_feedback: nova_mensagem = random.choice(lista_erros)
-                            feedback, ultimo_feedback = nova_mensagem, nova_mensagem
-                            acertos_consecutivos = 0
-                            letras_erradas_info.append((letra_sorteada, numero_correto))
+                            iniciar_tremor()
+                            feedback = escolher_mensagem(mensagens_erro[resultado.faixa])
                             feedback_cor = VERMELHO
-                            if som_erro: som_erro.play()
-                            if vidas <= 0: estado_jogo = "fim_de_jogo"
-                        if estado_jogo == "jogando": letra_sorteada, numero_correto = sortear_nova_letra()
+                            audio.tocar("erro")
+                            if resultado.fim_de_jogo:
+                                estado_jogo = "fim_de_jogo"
+                                registro.terminar_partida(partida_registro, partida.pontuacao, len(partida.letras_erradas_info))
+                        if estado_jogo == "jogando": reiniciar_animacao_letra()
                     except ValueError:
                         feedback = "Digite apenas números!"; feedback_cor = AMARELO
+                    except ErroProtocolo as e:
+                        feedback = f"Servidor: {e}"; feedback_cor = AMARELO
+                    except OSError as e:
+                        jogar_localmente(e); iniciar_partida()
+                        feedback = "Sem ligação ao servidor! Nova partida local."; feedback_cor = AMARELO
                     input_usuario = ""
                 elif event.key == pygame.K_BACKSPACE: input_usuario = input_usuario[:-1]
                 else:
                     if event.unicode.isdigit(): input_usuario += event.unicode
             
             elif estado_jogo == "menu":
-                if event.key == pygame.K_SPACE: fade_out_transicao(); resetar_jogo()
+                if event.key == pygame.K_SPACE: iniciar_partida()
             elif estado_jogo == "fim_de_jogo":
-                if event.key == pygame.K_SPACE: fade_out_transicao(); resetar_jogo()
+                if event.key == pygame.K_SPACE: iniciar_partida()
             elif estado_jogo == "confirmando_dificuldade":
-                if event.key == pygame.K_s: estado_jogo = "jogando"; nivel_atual_exibido = dificuldade_mantida
+                if event.key == pygame.K_s: estado_jogo = "jogando"; nivel_atual_exibido = partida.dificuldade_mantida
                 elif event.key == pygame.K_n: estado_jogo = "menu"
             elif estado_jogo == "confirmando_reset":
                 if event.key == pygame.K_s: estado_jogo = "menu"
                 elif event.key == pygame.K_n: estado_jogo = "jogando"
             elif estado_jogo == "settings":
-                if event.key == pygame.K_ESCAPE: estado_jogo = "jogando" if pontuacao > 0 or vidas < 3 else "menu"
+                if event.key == pygame.K_ESCAPE: estado_jogo = "jogando" if partida.iniciada else "menu"
+
+    agora = time.perf_counter()
+    for momento in entradas_quadro: latencia_logica.registrar((agora - momento) * 1000)
+    entradas_pendentes += entradas_quadro
 
     # --- LÓGICA DE ATUALIZAÇÃO ---
+    profiler.fase("atualizacao")
+    if carregador.carregando: carregador.processar(receber_asset)
+    audio.aplicar_volumes()
+    if redimensionamento_pendente:
+        if tempo_jogo_ms - momento_redimensionamento >= ATRASO_REDIMENSIONAMENTO_MS:
+            with trava_desenho: atualizar_elementos_escala(*redimensionamento_pendente)
+            redimensionamento_pendente = None
+        elif redimensionamento_pendente != (LARGURA_TELA, ALTURA_TELA):
+            with trava_desenho: atualizar_elementos_escala(*redimensionamento_pendente, previa=True)
+
     if estado_jogo == "jogando":
-        if acertos_consecutivos < 5: proximo_nivel_id = 0
-        elif acertos_consecutivos < 10: proximo_nivel_id = 1
-        else: proximo_nivel_id = 2
-        if proximo_nivel_id > dificuldade_mantida:
-            dificuldade_mantida = proximo_nivel_id
-            if dificuldade_mantida == 1: proximo_nome_nivel, proximo_descricao_nivel = "Médio", "Letras de A a O"
-            else: proximo_nome_nivel, proximo_descricao_nivel = "Difícil", "Todo o alfabeto"
+        novo_nivel = partida.atualizar_nivel()
+        if novo_nivel is not None:
+            proximo_nome_nivel, proximo_descricao_nivel = NOMES_NIVEL[novo_nivel], partida.descricao_nivel(novo_nivel)
             estado_jogo = "confirmando_dificuldade"
     
-    if animacao_letra_ativa:
-        letra_escala += 0.08
-        if letra_escala >= 1.0: letra_escala = 1.0; animacao_letra_ativa = False
-    
-    for particula in particulas[:]:
-        particula.update()
-        if particula.vida <= 0: particulas.remove(particula)
-    
-    if estado_jogo == "menu":
-        for letra in letras_flutuantes:
-            letra.update(LARGURA_TELA, ALTURA_TELA)
+    if estado_jogo == "fim_de_jogo" and partida.pontuacao > recorde_atual:
+        if not sessao_isolada: registro.em_segundo_plano(salvar_recorde, partida.pontuacao)
+        recorde_atual, novo_recorde = partida.pontuacao, True
 
-    # --- DESENHO NA TELA ---
-    offset_x, offset_y = 0, 0
-    if shake_timer > 0:
-        shake_timer -= 1; offset_x, offset_y = random.randint(-8, 8), random.randint(-8, 8)
+    # Pausas (configurações, confirmações) não contam para a latência: recomeça ao voltar
+    if estado_jogo != "jogando": momento_letra = None
+    elif momento_letra is None: momento_letra = time.perf_counter()
 
-    tela_desenho = tela
-    if shake_timer > 0: tela_desenho = tela.copy()
+    agendador.atualizar(dt_ms)
 
-    if fundo: tela_desenho.blit(fundo, (0, 0))
-    else: tela_desenho.fill(PRETO)
+    acumulador_simulacao = min(acumulador_simulacao + dt_ms, MAXIMO_ATRASO_MS)
+    while acumulador_simulacao >= PASSO_SIMULACAO_MS:
+        simular_passo(); acumulador_simulacao -= PASSO_SIMULACAO_MS
+    alpha_interpolacao = acumulador_simulacao / PASSO_SIMULACAO_MS
 
-    if estado_jogo == "menu":
-        for letra in letras_flutuantes: letra.draw(tela_desenho)
-        desenhar_texto("Adivinhe o Número da Letra", fonte_titulo, BRANCO, tela_desenho, LARGURA_TELA / 2, ALTURA_TELA / 4)
-        desenhar_texto(f"RECORDE: {recorde_atual}", fonte_media, AMARELO, tela_desenho, LARGURA_TELA / 2, ALTURA_TELA * 0.4)
-        desenhar_texto("Pressione ESPAÇO para começar", fonte_media, AZUL, tela_desenho, LARGURA_TELA / 2, ALTURA_TELA * 0.55)
-        desenhar_texto("Digite o número da letra e pressione Enter.", fonte_pequena, CINZA_CLARO, tela_desenho, LARGURA_TELA / 2, ALTURA_TELA * 0.7)
-        cor_settings_botao = CINZA_CLARO if settings_button_menu_rect.collidepoint(mouse_pos) else CINZA_ESCURO
-        pygame.draw.rect(tela_desenho, cor_settings_botao, settings_button_menu_rect, border_radius=int(settings_button_menu_rect.width / 2))
-        desenhar_texto("⚙️", fonte_para_emojis, BRANCO, tela_desenho, settings_button_menu_rect.centerx, settings_button_menu_rect.centery)
-
-    elif estado_jogo == "jogando" or estado_jogo == "confirmando_reset":
-        margem = ALTURA_TELA * 0.05
-        desenhar_texto(f"Pontuação: {pontuacao}", fonte_media, AMARELO, tela_desenho, margem, margem, align="topleft")
-        desenhar_texto(f"Vidas: {'❤️' * vidas}", fonte_para_emojis, VERMELHO, tela_desenho, LARGURA_TELA - margem, margem, align="topright")
-        cor_reset_botao = VERMELHO_BRILHANTE if reset_button_rect.collidepoint(mouse_pos) else VERMELHO_VINHO
-        pygame.draw.rect(tela_desenho, cor_reset_botao, reset_button_rect, border_radius=int(reset_button_rect.width / 2))
-        desenhar_texto("X", fonte_botao, BRANCO, tela_desenho, reset_button_rect.centerx, reset_button_rect.centery + (3 * (ALTURA_TELA/BASE_ALTURA)))
-        cor_settings_botao = CINZA_CLARO if settings_button_rect.collidepoint(mouse_pos) else CINZA_ESCURO
-        pygame.draw.rect(tela_desenho, cor_settings_botao, settings_button_rect, border_radius=int(settings_button_rect.width / 2))
-        desenhar_texto("⚙️", fonte_para_emojis, BRANCO, tela_desenho, settings_button_rect.centerx, settings_button_rect.centery)
-        desenhar_texto(letra_sorteada, fonte_grande, AZUL, tela_desenho, LARGURA_TELA / 2, ALTURA_TELA / 3, scale=letra_escala)
-        pygame.draw.rect(tela_desenho, CINZA_CLARO, input_rect_dims['rect'], input_rect_dims['border'], border_radius=input_rect_dims['radius'])
-        desenhar_texto(input_usuario, fonte_media, BRANCO, tela_desenho, LARGURA_TELA / 2, ALTURA_TELA / 2 + input_rect_dims['rect'][3] / 2)
-        feedback_rect = pygame.Rect(LARGURA_TELA * 0.1, ALTURA_TELA * 0.65, LARGURA_TELA * 0.8, ALTURA_TELA * 0.2)
-        desenhar_texto_com_quebra(feedback, fonte_feedback, feedback_cor, tela_desenho, feedback_rect)
-        if estado_jogo == "confirmando_reset":
-            overlay = pygame.Surface((LARGURA_TELA, ALTURA_TELA), pygame.SRCALPHA); overlay.fill((0, 0, 0, 180)); tela_desenho.blit(overlay, (0, 0))
-            desenhar_texto("Voltar ao Menu Principal?", fonte_titulo, AMARELO, tela_desenho, LARGURA_TELA / 2, ALTURA_TELA / 3)
-            desenhar_texto("Todo o progresso da partida será perdido.", fonte_pequena, CINZA_CLARO, tela_desenho, LARGURA_TELA / 2, ALTURA_TELA * 0.5)
-            desenhar_texto("Pressione [S] para confirmar ou [N] para cancelar", fonte_media, BRANCO, tela_desenho, LARGURA_TELA / 2, ALTURA_TELA * 0.65)
-
-    elif estado_jogo == "confirmando_dificuldade":
-        overlay = pygame.Surface((LARGURA_TELA, ALTURA_TELA), pygame.SRCALPHA); overlay.fill((0, 0, 0, 180)); tela_desenho.blit(overlay, (0, 0))
-        desenhar_texto("NOVO NÍVEL!", fonte_titulo, AMARELO, tela_desenho, LARGURA_TELA / 2, ALTURA_TELA / 3)
-        desenhar_texto(f"Dificuldade aumentada para {proximo_nome_nivel} ({proximo_descricao_nivel})", fonte_media, BRANCO, tela_desenho, LARGURA_TELA / 2, ALTURA_TELA * 0.5)
-        desenhar_texto("Pressione [S] para continuar ou [N] para voltar ao menu", fonte_pequena, AMARELO, tela_desenho, LARGURA_TELA / 2, ALTURA_TELA * 0.75)
-
-    elif estado_jogo == "settings":
-        if fundo: tela_desenho.blit(fundo, (0, 0))
-        else: tela_desenho.fill(PRETO)
-        overlay = pygame.Surface((LARGURA_TELA, ALTURA_TELA), pygame.SRCALPHA); overlay.fill((0, 0, 0, 180)); tela_desenho.blit(overlay, (0, 0))
-        pygame.draw.rect(tela_desenho, PRETO, (LARGURA_TELA * 0.2, ALTURA_TELA * 0.2, LARGURA_TELA * 0.6, ALTURA_TELA * 0.6), border_radius=20)
-        pygame.draw.rect(tela_desenho, AZUL, (LARGURA_TELA * 0.2, ALTURA_TELA * 0.2, LARGURA_TELA * 0.6, ALTURA_TELA * 0.6), 5, border_radius=20)
-        desenhar_texto("Configurações de Áudio", fonte_media, BRANCO, tela_desenho, LARGURA_TELA / 2, ALTURA_TELA * 0.25)
-        desenhar_texto("Música", fonte_pequena, BRANCO, tela_desenho, LARGURA_TELA/2, music_slider_rect.y - 30)
-        pygame.draw.rect(tela_desenho, CINZA_ESCURO, music_slider_rect, border_radius=10)
-        music_handle_rect.center = (music_slider_rect.left + music_slider_rect.width * volume_musica, music_slider_rect.centery)
-        pygame.draw.rect(tela_desenho, AZUL, music_handle_rect, border_radius=8)
-        desenhar_texto("Efeitos Sonoros", fonte_pequena, BRANCO, tela_desenho, LARGURA_TELA/2, sfx_slider_rect.y - 30)
-        pygame.draw.rect(tela_desenho, CINZA_ESCURO, sfx_slider_rect, border_radius=10)
-        sfx_handle_rect.center = (sfx_slider_rect.left + sfx_slider_rect.width * volume_sfx, sfx_slider_rect.centery)
-        pygame.draw.rect(tela_desenho, AZUL, sfx_handle_rect, border_radius=8)
-        cor_close_botao = VERMELHO_BRILHANTE if settings_close_button_rect.collidepoint(mouse_pos) else VERMELHO_VINHO
-        pygame.draw.rect(tela_desenho, cor_close_botao, settings_close_button_rect, border_radius=int(settings_close_button_rect.width/2))
-        desenhar_texto("X", fonte_botao, BRANCO, tela_desenho, settings_close_button_rect.centerx, settings_close_button_rect.centery + (3 * (ALTURA_TELA/BASE_ALTURA)))
-
-    elif estado_jogo == "fim_de_jogo":
-        if pontuacao > recorde_atual:
-            salvar_recorde(pontuacao); recorde_atual = pontuacao
-            desenhar_texto("NOVO RECORDE!", fonte_titulo, AMARELO, tela, LARGURA_TELA / 2, ALTURA_TELA / 4)
+    # --- DESENHO NA TELA ---
+    if thread_desenho:
+        # Parado à espera de eventos, o estado não muda: não há foto nova para desenhar
+        if eventos or modo_desenho != "espera": thread_desenho.publicar(fotografar())
+    elif not reproducao_rapida:
+        profiler.fase("desenho")
+        foto = fotografar()
+        if renderizador and not round(foto.tremor):
+            renderizador.desenhar(foto)
         else:
-            desenhar_texto("FIM DE JOGO", fonte_titulo, VERMELHO, tela, LARGURA_TELA / 2, ALTURA_TELA / 4)
-        desenhar_texto(f"Pontuação Final: {pontuacao}", fonte_media, BRANCO, tela, LARGURA_TELA / 2, ALTURA_TELA / 2)
-        if letras_erradas_info:
-            desenhar_texto("Respostas corretas:", fonte_pequena, CINZA_CLARO, tela, LARGURA_TELA / 2, ALTURA_TELA * 0.60)
-            pos_y = ALTURA_TELA * 0.65
-            texto_erradas = ", ".join([f"{letra} = {num}" for letra, num in letras_erradas_info])
-            desenhar_texto(texto_erradas, fonte_pequena, BRANCO, tela, LARGURA_TELA / 2, pos_y)
-        desenhar_texto("Pressione ESPAÇO para jogar novamente", fonte_media, AMARELO, tela, LARGURA_TELA / 2, ALTURA_TELA * 0.77)
-
-    # Desenhando os créditos em todas as telas
-    margem_creditos = ALTURA_TELA * 0.04
-    desenhar_texto("Por: Lucas N :)", fonte_creditos, CINZA_CLARO, tela_desenho, LARGURA_TELA - margem_creditos, ALTURA_TELA - margem_creditos, align="topright")
+            desenhar_quadro_completo(tela, foto)
+            profiler.fase("apresentacao")
+            pygame.display.flip()
+            if renderizador: renderizador.invalidar()
+        quadro_apresentado(foto)
+    elif tempo_primeiro_quadro_ms is None: tempo_primeiro_quadro_ms = (time.perf_counter() - INICIO_PROCESSO) * 1000
 
-    for particula in particulas:
-        particula.draw(tela_desenho)
-
-    if shake_timer > 0:
-        tela.blit(tela_desenho, (offset_x, offset_y))
-    
-    pygame.display.flip()
-    relogio.tick(60)
+    mostrar_tempos_carregamento()
+    modo_desenho = escolher_modo_desenho()
+    if thread_desenho:
+        profiler.fase(None)
+        if not leitor_entrada:  # a reprodução já espera pelo ritmo da gravação
+            proximo_passo_logica = max(proximo_passo_logica + 1 / TAXA_LOGICA_HZ, time.perf_counter())
+        thread_desenho.apresentar_ate(proximo_passo_logica)
+    if leitor_entrada: relogio.tick()  # o dt vem da gravação
+    elif thread_desenho: dt_ms = relogio.tick()
+    else: dt_ms = relogio.tick(fps_do_modo(modo_desenho))
+    if roteiro_benchmark and roteiro_benchmark.depois_do_quadro(): rodando = False
 
+if thread_desenho: thread_desenho.fechar()
+profiler.fechar()
+registro.fechar()
+if isinstance(partida, PartidaRemota): partida.fechar()
+if roteiro_benchmark: roteiro_benchmark.gravar(args.benchmark_saida, (LARGURA_TELA, ALTURA_TELA))
+if gravador_entrada: gravador_entrada.fechar(resumo_sessao())
+reproducao_confere = conferir_reproducao(time.perf_counter() - inicio_loop) if leitor_entrada else True
+if args.latencia:
+    for nome, contador in (("entrada -> lógica", latencia_logica), ("entrada -> ecrã", latencia_ecra)):
+        print(f"Latência {nome}: p50 {contador.percentis()[0]:.1f} ms  p95 {contador.percentis()[1]:.1f} ms  "
+              f"p99 {contador.percentis()[2]:.1f} ms  ({contador.total} entradas)")
 pygame.quit()
-sys.exit()
\ No newline at end of file
+sys.exit(0 if reproducao_confere else 1)
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""Pacote de assets: todos os ficheiros do jogo num só ficheiro indexado, lido com mmap.
+
+O passo de build (este script) grava `assets.pak`. As imagens vão já descodificadas, em
+píxeis crus no formato do ecrã (BGRA, alfa 255): no tamanho original e pré-escaladas para
+as resoluções mais comuns. O jogo mapeia o pacote com mmap e cria cada superfície com
+pygame.image.frombuffer sobre o próprio mapa, sem descodificar PNG nem copiar píxeis; as
+páginas só são lidas do disco quando a imagem é desenhada e ficam no page cache, não na
+memória privada do processo. Fontes e MP3 vão como estão; os efeitos sonoros levam também o
+PCM já descodificado no formato do mixer usado no build.
+
+Formato: cabeçalho, índice JSON (nome -> deslocamento, tamanho, tipo, ficheiro de origem...) e
+os dados, cada um alinhado a 64 bytes. Sem o pacote, main.py lê os ficheiros soltos como antes;
+com ele, as entradas cujo ficheiro solto mudou desde o build são ignoradas e lidas do ficheiro.
+
+    python pacote_assets.py
+    python pacote_assets.py --resolucoes 1280x720 1366x768 1920x1080 2560x1440
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+
+import pygame
+
+ARQUIVO_PACOTE = "assets.pak"
+MAGIA, VERSAO = b"AQPK", 2
+CABECALHO = struct.Struct("<4sBxxxI")   # magia, versão, tamanho do índice
+ALINHAMENTO = 64
+FORMATO_PIXEIS = "BGRA"                 # a ordem dos bytes de uma superfície convert() em little-endian
+
+IMAGENS = ("fundo.png",)
+SONS = ("acerto.mp3", "erro.mp3")
+OUTROS = ("DejaVuSans.ttf", "musica_fundo.mp3")
+RESOLUCOES_PADRAO = ((320, 180), (1280, 720), (1920, 1080))  # 320x180: a prévia durante o redimensionamento
+
+
+def chave_imagem(nome, tamanho=None):
+    return f"{nome}@{tamanho[0]}x{tamanho[1]}" if tamanho else nome
+
+
+def chave_pcm(nome, formato):
+    return f"{nome}@{'_'.join(map(str, formato))}.pcm"
+
+
+def resumo_arquivo(caminho):
+    with open(caminho, "rb") as f: return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def carimbo_origem(caminho):
+    """O que o índice guarda do ficheiro solto de que uma entrada foi feita."""
+    estado = os.stat(caminho)
+    return {"tamanho": estado.st_size, "mtime_ns": estado.st_mtime_ns, "blake2b": resumo_arquivo(caminho)}
+
+
+def origem_mudou(caminho, carimbo):
+    """Tamanho e data chegam quase sempre; só com datas diferentes e o mesmo tamanho se lê o ficheiro."""
+    try: estado = os.stat(caminho)
+    except FileNotFoundError: return False  # só o pacote foi distribuído (o .EXE)
+    if estado.st_size != carimbo["tamanho"]: return True
+    return estado.st_mtime_ns != carimbo["mtime_ns"] and resumo_arquivo(caminho) != carimbo["blake2b"]
+
+
+class PacoteAssets:
+    """Leitura do pacote. As superfícies devolvidas apontam para o mapa: não o fechar enquanto existirem."""
+
+    def __init__(self, caminho):
+        with open(caminho, "rb") as f:
+            # ACCESS_COPY: se alguém desenhar sobre uma destas superfícies, a página é copiada
+            # para o processo em vez de falhar (ou de alterar o ficheiro)
+            self.mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        magia, versao, tamanho_indice = CABECALHO.unpack_from(self.mapa)
+        if magia != MAGIA: raise ValueError(f"{caminho}: não é um pacote de assets válido")
+        if versao != VERSAO: raise ValueError(f"{caminho}: pacote da versão {versao}, gere-o de novo com pacote_assets.py")
+        self.indice = json.loads(self.mapa[CABECALHO.size:CABECALHO.size + tamanho_indice])
+        self.vista = memoryview(self.mapa)
+        self.descartar_desatualizadas(os.path.dirname(os.path.abspath(caminho)))
+
+    def descartar_desatualizadas(self, pasta):
+        """Tira do índice as entradas feitas de ficheiros soltos que mudaram depois do build."""
+        carimbos = {entrada["origem"]: entrada["carimbo"] for entrada in self.indice.values()}
+        mudados = {nome for nome, carimbo in carimbos.items() if origem_mudou(os.path.join(pasta, nome), carimbo)}
+        for nome in sorted(mudados):
+            print(f"Aviso: '{nome}' mudou desde que o pacote foi gerado, a usar o ficheiro solto.")
+        self.indice = {chave: entrada for chave, entrada in self.indice.items() if entrada["origem"] not in mudados}
+
+    def __contains__(self, nome):
+        return nome in self.indice
+
+    def _dados(self, entrada):
+        return self.vista[entrada["deslocamento"]:entrada["deslocamento"] + entrada["tamanho"]]
+
+    def bytes(self, nome):
+        return bytes(self._dados(self.indice[nome]))
+
+    def imagem(self, nome, tamanho=None):
+        """Superfície sem cópia, no tamanho original ou numa versão pré-escalada (None se não houver)."""
+        entrada = self.indice.get(chave_imagem(nome, tamanho))
+        if entrada is None: return None
+        superficie = pygame.image.frombuffer(self._dados(entrada), (entrada["largura"], entrada["altura"]), entrada["formato"])
+        superficie.set_alpha(None)  # o alfa é sempre 255: blit como cópia, sem mistura
+        return superficie
+
+    def pcm(self, nome, formato):
+        """PCM de um som já descodificado para o formato do mixer (frequência, tamanho, canais), ou None."""
+        entrada = self.indice.get(chave_pcm(nome, formato))
+        return None if entrada is None else self._dados(entrada)
+
+
+def abrir_pacote(caminho):
+    """O pacote, ou None se não existir (o jogo usa então os ficheiros soltos)."""
+    try:
+        return PacoteAssets(caminho)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Aviso: pacote de assets ignorado ({e}).")
+        return None
+
+
+# --- Build ---
+def pixeis_opacos(superficie):
+    """Bytes BGRA com alfa 255, os mesmos píxeis que `convert()` daria no ecrã."""
+    pixeis = bytearray(pygame.image.tobytes(superficie, FORMATO_PIXEIS))
+    pixeis[3::4] = b"\xff" * (len(pixeis) // 4)
+    return pixeis
+
+
+def entradas_imagem(pasta, nome, resolucoes):
+    original = pygame.image.load(os.path.join(pasta, nome))
+    opaca = pygame.image.frombuffer(pixeis_opacos(original), original.get_size(), FORMATO_PIXEIS)
+    yield chave_imagem(nome), opaca
+    for tamanho in resolucoes:
+        if tamanho != opaca.get_size():
+            yield chave_imagem(nome, tamanho), pygame.transform.smoothscale(opaca, tamanho)
+
+
+def gerar_pacote(pasta, saida, resolucoes):
+    pygame.mixer.init()  # mesmos parâmetros que main.py: o PCM fica no formato que o jogo vai pedir
+    formato_mixer = pygame.mixer.get_init()
+    entradas = []  # (nome, metadados, dados)
+    for nome in IMAGENS:
+        origem = {"origem": nome, "carimbo": carimbo_origem(os.path.join(pasta, nome))}
+        for chave, superficie in entradas_imagem(pasta, nome, resolucoes):
+            largura, altura = superficie.get_size()
+            metadados = {"tipo": "imagem", "largura": largura, "altura": altura, "formato": FORMATO_PIXEIS, **origem}
+            entradas.append((chave, metadados, pixeis_opacos(superficie)))
+    for nome in SONS + OUTROS:
+        caminho = os.path.join(pasta, nome)
+        if not os.path.exists(caminho):
+            print(f"Aviso: '{nome}' não encontrado, fica fora do pacote.")
+            continue
+        with open(caminho, "rb") as f: dados = f.read()
+        origem = {"origem": nome, "carimbo": carimbo_origem(caminho)}
+        entradas.append((nome, {"tipo": "bytes", **origem}, dados))
+        if nome in SONS:
+            pcm = pygame.mixer.Sound(caminho).get_raw()
+            entradas.append((chave_pcm(nome, formato_mixer), {"tipo": "pcm", "formato": formato_mixer, **origem}, pcm))
+
+    # Os deslocamentos dependem do tamanho do índice, que depende dos deslocamentos: o índice
+    # é reservado com folga e completado com espaços
+    alinhar = lambda n: -(-n // ALINHAMENTO) * ALINHAMENTO
+    reservado = alinhar(len(json.dumps({n: dict(m, deslocamento=2**40, tamanho=2**40) for n, m, _ in entradas})) + 1)
+    indice, posicao = {}, alinhar(CABECALHO.size + reservado)
+    for nome, metadados, dados in entradas:
+        indice[nome] = dict(metadados, deslocamento=posicao, tamanho=len(dados))
+        posicao = alinhar(posicao + len(dados))
+    texto_indice = json.dumps(indice).encode().ljust(reservado)
+
+    temporario = saida + ".tmp"
+    with open(temporario, "wb") as f:
+        f.write(CABECALHO.pack(MAGIA, VERSAO, len(texto_indice)) + texto_indice)
+        for nome, _, dados in entradas:
+            f.seek(indice[nome]["deslocamento"])
+            f.write(dados)
+        f.truncate(posicao)
+    os.replace(temporario, saida)
+    return indice
+
+
+def ler_resolucao(texto):
+    largura, altura = (int(valor) for valor in texto.lower().split("x"))
+    return largura, altura
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera o pacote de assets lido com mmap por main.py")
+    parser.add_argument("--pasta", default=os.path.dirname(os.path.abspath(__file__)), help="onde estão os assets soltos")
+    parser.add_argument("--saida", default=ARQUIVO_PACOTE)
+    parser.add_argument("--resolucoes", nargs="*", type=ler_resolucao, default=RESOLUCOES_PADRAO, metavar="LxA",
+                        help="tamanhos de janela com o fundo já escalado (os restantes escalam no arranque)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")  # o build só descodifica, não toca nada
+    inicio = time.perf_counter()
+    indice = gerar_pacote(args.pasta, args.saida, args.resolucoes)
+    for nome, entrada in indice.items():
+        print(f"{nome:<36}{entrada['tipo']:<8}{entrada['tamanho'] / 1024:10.0f} KiB")
+    print(f"{args.saida}: {os.path.getsize(args.saida) / 2**20:.1f} MiB em {time.perf_counter() - inicio:.1f}s")
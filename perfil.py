@@ -0,0 +1,100 @@
+"""Medição do tempo de cada fase do quadro (eventos, atualização, desenho, apresentação).
+
+O loop principal marca o início de cada fase com `fase(nome)`; secções internas (texto,
+partículas) acumulam o seu tempo com `relogio()` + `acumular()`. Guarda as últimas amostras
+para percentis e pode gravar uma linha CSV por quadro. Desligado, usa-se o ProfilerNulo, cujos
+métodos não fazem nada. O ContadorLatencia guarda latências avulsas (da entrada à lógica, da
+entrada ao ecrã) com os mesmos percentis.
+"""
+import csv
+from collections import deque
+from time import perf_counter
+
+FASES = ("eventos", "atualizacao", "desenho", "apresentacao")
+SECOES = ("texto", "particulas")
+
+
+def calcular_percentis(amostras, percentis=(50, 95, 99)):
+    amostras = sorted(amostras)
+    if not amostras: return (0.0,) * len(percentis)
+    ultimo = len(amostras) - 1
+    return tuple(amostras[min(ultimo, round(p / 100 * ultimo))] for p in percentis)
+
+
+class ProfilerQuadros:
+    ativo = True
+
+    def __init__(self, amostras=600, caminho_csv=None):
+        self.colunas = ("quadro",) + FASES + SECOES
+        self.historico = {nome: deque(maxlen=amostras) for nome in self.colunas}
+        self.atual = dict.fromkeys(self.colunas, 0.0)
+        self.fase_atual, self.inicio_fase, self.inicio_quadro = None, 0.0, None
+        self.numero_quadro = 0
+        self.arquivo_csv, self.escritor_csv = None, None
+        if caminho_csv:
+            self.arquivo_csv = open(caminho_csv, 'w', newline='')
+            self.escritor_csv = csv.writer(self.arquivo_csv)
+            self.escritor_csv.writerow(("numero",) + tuple(f"{nome}_ms" for nome in self.colunas))
+
+    def relogio(self):
+        return perf_counter()
+
+    def acumular(self, secao, inicio):
+        self.atual[secao] += perf_counter() - inicio
+
+    def fase(self, nome):
+        """Termina a fase em curso e começa `nome`."""
+        agora = perf_counter()
+        if self.fase_atual: self.atual[self.fase_atual] += agora - self.inicio_fase
+        self.fase_atual, self.inicio_fase = nome, agora
+
+    def novo_quadro(self):
+        """Fecha o quadro anterior (guarda as amostras) e começa a contar o próximo."""
+        agora = perf_counter()
+        if self.inicio_quadro is not None:
+            self.fase(None)
+            self.atual["quadro"] = agora - self.inicio_quadro
+            valores = [self.atual[nome] * 1000 for nome in self.colunas]
+            for nome, valor in zip(self.colunas, valores): self.historico[nome].append(valor)
+            if self.escritor_csv: self.escritor_csv.writerow([self.numero_quadro] + [f"{v:.3f}" for v in valores])
+            self.numero_quadro += 1
+            for nome in self.colunas: self.atual[nome] = 0.0
+        self.inicio_quadro = agora
+
+    def percentis(self, nome, percentis=(50, 95, 99)):
+        return calcular_percentis(self.historico[nome], percentis)
+
+    def fechar(self):
+        if self.arquivo_csv: self.arquivo_csv.close(); self.arquivo_csv, self.escritor_csv = None, None
+
+
+class ProfilerNulo:
+    """Substituto com a mesma interface para quando a medição está desligada."""
+    ativo = False
+
+    def relogio(self): return 0.0
+    def acumular(self, secao, inicio): pass
+    def fase(self, nome): pass
+    def novo_quadro(self): pass
+    def fechar(self): pass
+
+
+class ContadorLatencia:
+    """Latências em ms das últimas `amostras` ocorrências; `total` conta todas desde o início.
+
+    Pode ser alimentado por uma thread e lido por outra: só acrescenta a um deque.
+    """
+
+    def __init__(self, amostras=2000):
+        self.amostras = deque(maxlen=amostras)
+        self.total = 0
+
+    def registrar(self, ms):
+        self.amostras.append(ms)
+        self.total += 1
+
+    def limpar(self):
+        self.amostras.clear(); self.total = 0
+
+    def percentis(self, percentis=(50, 95, 99)):
+        return calcular_percentis(list(self.amostras), percentis)
@@ -0,0 +1,207 @@
+"""Registo de todas as respostas num SQLite em modo WAL, escrito por uma thread à parte.
+
+O loop principal só põe tuplos numa fila (`registrar`); a thread escritora junta o que houver
+na fila e grava-o numa única transação, por isso o disco nunca atrasa um quadro. As consultas
+(precisão por letra, percentis de latência) abrem a sua própria ligação: em WAL os leitores não
+bloqueiam o escritor. Sem disco disponível, usa-se o RegistroNulo.
+
+    python registro.py                    # estatísticas do historico.db
+    python registro.py --gerar 2000000    # enche um banco com respostas sintéticas
+"""
+import argparse
+import queue
+import random
+import sqlite3
+import threading
+import time
+
+ARQUIVO_HISTORICO = "historico.db"
+LOTE_MAXIMO = 1000  # linhas por transação
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS partidas (
+    id INTEGER PRIMARY KEY, inicio REAL NOT NULL, fim REAL, pontuacao INTEGER, erros INTEGER
+);
+CREATE TABLE IF NOT EXISTS respostas (
+    partida INTEGER NOT NULL, momento REAL NOT NULL, letra TEXT NOT NULL, resposta INTEGER NOT NULL,
+    correta INTEGER NOT NULL, latencia_ms INTEGER NOT NULL, nivel INTEGER NOT NULL, sequencia INTEGER NOT NULL
+);
+-- Os percentis andam pelos índices já ordenados em vez de ordenar a tabela
+CREATE INDEX IF NOT EXISTS respostas_letra_latencia ON respostas (letra, latencia_ms, correta);
+CREATE INDEX IF NOT EXISTS respostas_latencia ON respostas (latencia_ms);
+"""
+
+_FIM = object()
+
+
+def conectar(caminho):
+    conexao = sqlite3.connect(caminho, check_same_thread=False)
+    conexao.execute("PRAGMA journal_mode=WAL")
+    conexao.execute("PRAGMA synchronous=NORMAL")  # em WAL só perde transações num corte de energia
+    return conexao
+
+
+class RegistroRespostas:
+    def __init__(self, caminho=ARQUIVO_HISTORICO):
+        self.caminho = caminho
+        conexao = conectar(caminho)
+        with conexao: conexao.executescript(ESQUEMA)
+        conexao.close()
+        # O loop recebe números locais para não esperar pela thread escritora; o id real é dado
+        # pelo SQLite ao inserir, por isso vários processos podem partilhar o mesmo banco
+        self.ultima_partida = 0
+        self.ids_partidas = {}  # número local -> id no banco (só a thread escritora mexe)
+        self.fila = queue.Queue()
+        self.leitura = None
+        self.thread = threading.Thread(target=self._escrever, name="registro-respostas", daemon=True)
+        self.thread.start()
+
+    # --- Chamado pelo loop principal: só enfileira ---
+    def iniciar_partida(self):
+        """Número (local a este processo) da partida, a passar a `registrar` e `terminar_partida`."""
+        self.ultima_partida += 1
+        self.fila.put(("partida", (self.ultima_partida, time.time())))
+        return self.ultima_partida
+
+    def terminar_partida(self, partida, pontuacao, erros):
+        self.fila.put(("fim", (time.time(), pontuacao, erros, partida)))
+
+    def registrar(self, partida, letra, resposta, correta, latencia_ms, nivel, sequencia):
+        self.fila.put(("resposta", (partida, time.time(), letra, resposta, int(correta), round(latencia_ms), nivel, sequencia)))
+
+    def em_segundo_plano(self, funcao, *argumentos):
+        """Corre outra escrita pequena (ex.: o ficheiro de recorde) na thread do registo."""
+        self.fila.put(("tarefa", (funcao, argumentos)))
+
+    def fechar(self):
+        """Grava o que ainda estiver na fila e termina a thread."""
+        self.fila.put(_FIM)
+        self.thread.join()
+        if self.leitura: self.leitura.close(); self.leitura = None
+
+    # --- Thread escritora ---
+    def _id_partida(self, conexao, local, inicio, novos):
+        """Id no banco da partida `local`, inserida agora se ainda não existir."""
+        id_partida = self.ids_partidas.get(local)
+        if id_partida is None:
+            id_partida = conexao.execute("INSERT INTO partidas (inicio) VALUES (?)", (inicio,)).lastrowid
+            self.ids_partidas[local] = id_partida
+            novos.append(local)
+        return id_partida
+
+    def _escrever(self):
+        conexao = conectar(self.caminho)
+        terminar = False
+        while not terminar:
+            itens = [self.fila.get()]
+            while len(itens) < LOTE_MAXIMO:
+                try: itens.append(self.fila.get_nowait())
+                except queue.Empty: break
+            if _FIM in itens: terminar = True
+            respostas, tarefas, novos = [], [], []
+            try:
+                with conexao:
+                    for item in itens:
+                        if item is _FIM: continue
+                        tipo, dados = item
+                        if tipo == "resposta":
+                            respostas.append((self._id_partida(conexao, dados[0], dados[1], novos),) + dados[1:])
+                        elif tipo == "partida": self._id_partida(conexao, *dados, novos)
+                        elif tipo == "fim":
+                            momento, pontuacao, erros, local = dados
+                            conexao.execute("UPDATE partidas SET fim = ?, pontuacao = ?, erros = ? WHERE id = ?",
+                                            (momento, pontuacao, erros, self._id_partida(conexao, local, momento, novos)))
+                        else: tarefas.append(dados)
+                    conexao.executemany("INSERT INTO respostas VALUES (?, ?, ?, ?, ?, ?, ?, ?)", respostas)
+            except sqlite3.Error as e:
+                print(f"Erro ao gravar o histórico: {e}")
+                # As partidas inseridas neste lote foram desfeitas: voltam a ser inseridas quando aparecerem
+                for local in novos: del self.ids_partidas[local]
+            for funcao, argumentos in tarefas: funcao(*argumentos)
+        conexao.close()
+
+    # --- Consultas ---
+    def _consultar(self, sql, parametros=()):
+        if self.leitura is None: self.leitura = sqlite3.connect(self.caminho, check_same_thread=False)
+        return self.leitura.execute(sql, parametros).fetchall()
+
+    def precisao_por_letra(self):
+        """{letra: (respostas, acertos, fração de acertos)}, só para letras já respondidas."""
+        linhas = self._consultar("SELECT letra, COUNT(*), SUM(correta) FROM respostas GROUP BY letra")
+        return {letra: (total, acertos, acertos / total) for letra, total, acertos in linhas}
+
+    def percentis_latencia(self, letra=None, percentis=(50, 90, 99)):
+        """Latência (ms) nos percentis pedidos, de todas as respostas ou só de uma letra.
+
+        Cada percentil é um salto (OFFSET) no índice ordenado por latência: não ordena a tabela.
+        """
+        filtro, parametros = ("WHERE letra = ?", (letra,)) if letra else ("", ())
+        total = self._consultar(f"SELECT COUNT(*) FROM respostas {filtro}", parametros)[0][0]
+        if total == 0: return {p: None for p in percentis}
+        resultado = {}
+        for p in percentis:
+            posicao = min(total - 1, round(p / 100 * (total - 1)))
+            resultado[p] = self._consultar(f"SELECT latencia_ms FROM respostas {filtro} ORDER BY latencia_ms LIMIT 1 OFFSET ?",
+                                           parametros + (posicao,))[0][0]
+        return resultado
+
+    def percentis_latencia_por_letra(self, percentis=(50, 90, 99)):
+        return {letra: self.percentis_latencia(letra, percentis) for letra in sorted(self.precisao_por_letra())}
+
+
+class RegistroNulo:
+    """Substituto com a mesma interface para quando não há histórico (ex.: benchmark)."""
+
+    def iniciar_partida(self): return 0
+    def terminar_partida(self, partida, pontuacao, erros): pass
+    def registrar(self, partida, letra, resposta, correta, latencia_ms, nivel, sequencia): pass
+    def em_segundo_plano(self, funcao, *argumentos): funcao(*argumentos)
+    def fechar(self): pass
+
+
+def abrir_registro(caminho=ARQUIVO_HISTORICO):
+    """RegistroRespostas, ou RegistroNulo (com aviso) se o banco não puder ser aberto."""
+    try:
+        return RegistroRespostas(caminho)
+    except (sqlite3.Error, OSError) as e:
+        print(f"Aviso: histórico de respostas desligado ({e}).")
+        return RegistroNulo()
+
+
+def gerar_respostas(registro, quantidade, semente=None):
+    """Respostas sintéticas para medir as consultas em bancos grandes."""
+    from logica import LETRAS_NUMEROS, TODAS_LETRAS
+    rng = random.Random(semente)
+    for i in range(quantidade):
+        if i % 200 == 0: partida = registro.iniciar_partida()
+        letra = rng.choice(TODAS_LETRAS)
+        correta = rng.random() < 0.97 - 0.01 * TODAS_LETRAS.index(letra)
+        resposta = LETRAS_NUMEROS[letra] if correta else LETRAS_NUMEROS[letra] + rng.randint(1, 5)
+        registro.registrar(partida, letra, resposta, correta, rng.lognormvariate(7.3, 0.4), i % 3, i % 20)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estatísticas do histórico de respostas")
+    parser.add_argument("--banco", default=ARQUIVO_HISTORICO)
+    parser.add_argument("--gerar", type=int, metavar="N", help="acrescenta N respostas sintéticas antes de consultar")
+    args = parser.parse_args()
+
+    registro = RegistroRespostas(args.banco)
+    if args.gerar:
+        inicio = time.perf_counter()
+        gerar_respostas(registro, args.gerar)
+        registro.fechar()
+        print(f"{args.gerar} respostas gravadas em {time.perf_counter() - inicio:.1f}s")
+        registro = RegistroRespostas(args.banco)
+
+    inicio = time.perf_counter()
+    precisao = registro.precisao_por_letra()
+    latencias = registro.percentis_latencia_por_letra()
+    geral = registro.percentis_latencia()
+    print(f"{'letra':<7}{'respostas':>11}{'acertos':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}")
+    for letra, (total, _, taxa) in sorted(precisao.items()):
+        p = latencias[letra]
+        print(f"{letra:<7}{total:>11}{taxa:>9.1%}{p[50]:>9}{p[90]:>9}{p[99]:>9}")
+    print(f"Latência geral: p50 {geral[50]} ms  p90 {geral[90]} ms  p99 {geral[99]} ms")
+    print(f"Consultas em {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    registro.fechar()
@@ -0,0 +1,264 @@
+"""Servidor de partidas para uma sala inteira: muitas sessões num só processo asyncio.
+
+Cada ligação (TCP ou socket Unix) é uma sessão com a sua Partida de logica.py — as mesmas
+regras da janela: vidas, bónus por sequência, níveis e sorteio sem repetir as recentes. O
+protocolo é uma linha de texto por pedido e uma por resposta:
+
+    N          nova partida                 -> L pontos vidas sequência nível letra
+    S          estado atual                 -> L pontos vidas sequência nível letra
+    R <número> responde à letra atual       -> C bónus pontos vidas sequência nível letra_seguinte
+                                               E faixa certo pontos vidas sequência nível letra_seguinte
+    Q          termina a sessão
+    (erro)                                  -> X mensagem
+
+Depois de um erro que acaba a partida, `vidas` é 0 e não há letra seguinte. A janela pode
+ser um destes clientes (main.py --servidor ENDEREÇO, via PartidaRemota); carga.py gera
+milhares de clientes para medir o servidor.
+
+    python servidor.py --porta 7626
+    python servidor.py --unix /tmp/quiz.sock --baralho quimica.txt
+"""
+import argparse
+import asyncio
+import random
+import socket
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from baralho import Baralho, carregar_baralho
+from logica import LETRAS_NUMEROS, LETRAS_POR_NIVEL, Partida, ResultadoResposta, VIDAS_INICIAIS
+
+PORTA_PADRAO = 7626
+TAMANHO_MAXIMO_LINHA = 256
+# O cliente da janela pede na thread do jogo: uma resposta atrasada congela o quadro até este
+# tempo, o mesmo atraso que o loop aceita recuperar (MAXIMO_ATRASO_MS). Numa sala, um pedido
+# demora menos de 1 ms; passado o limite a janela passa a jogar localmente.
+TEMPO_LIMITE_CLIENTE_S = 0.25
+INTERVALO_ESTATISTICAS_S = 10
+
+
+def linha_estado(partida):
+    return (f"L {partida.pontuacao} {partida.vidas} {partida.acertos_consecutivos} "
+            f"{partida.dificuldade_mantida} {partida.letra_sorteada}\n").encode()
+
+
+class SessaoQuiz(asyncio.Protocol):
+    """Uma ligação = uma partida. Sem corrotina por cliente: só callbacks do loop."""
+    __slots__ = ("servidor", "transporte", "partida", "pendente", "a_terminar")
+
+    def __init__(self, servidor):
+        self.servidor, self.transporte, self.pendente = servidor, None, b""
+        self.partida = servidor.nova_partida()
+        self.a_terminar = False
+
+    def connection_made(self, transporte):
+        self.transporte = transporte
+        self.servidor.sessoes += 1
+
+    def connection_lost(self, excecao):
+        self.servidor.sessoes -= 1
+
+    def data_received(self, dados):
+        linhas = (self.pendente + dados).split(b"\n")
+        self.pendente = linhas.pop()
+        # Pedidos enviados de seguida (pipelining) recebem as respostas numa só escrita; um Q,
+        # ou um resto de linha demasiado longo, fecha a ligação só depois de escritas as
+        # respostas aos pedidos completos que vieram antes dele
+        respostas = []
+        for linha in linhas:
+            if linha.strip(): respostas.append(self.tratar(linha.strip()))
+            if self.a_terminar: break
+        if not self.a_terminar and len(self.pendente) > TAMANHO_MAXIMO_LINHA:
+            respostas.append(b"X linha demasiado longa\n"); self.a_terminar = True
+        if respostas: self.transporte.write(b"".join(respostas))
+        if self.a_terminar: self.transporte.close()
+
+    def tratar(self, linha):
+        partida = self.partida
+        comando = linha[:1]
+        if comando == b"R":
+            try: resposta = int(linha[1:])
+            except ValueError: return b"X numero invalido\n"
+            if partida.terminada: return b"X partida terminada\n"
+            correto = partida.numero_correto
+            resultado = partida.responder(resposta)
+            partida.atualizar_nivel()
+            self.servidor.respostas += 1
+            letra = "" if resultado.fim_de_jogo else partida.letra_sorteada
+            fim = f"{partida.pontuacao} {partida.vidas} {partida.acertos_consecutivos} {partida.dificuldade_mantida} {letra}\n"
+            if resultado.correta: return f"C {resultado.bonus} {fim}".encode()
+            return f"E {resultado.faixa} {correto} {fim}".encode()
+        if comando == b"N":
+            partida.reiniciar()
+            return linha_estado(partida)
+        if comando == b"S": return linha_estado(partida)
+        if comando == b"Q":
+            self.a_terminar = True
+            return b""
+        return b"X comando desconhecido\n"
+
+
+class ServidorQuiz:
+    def __init__(self, baralho=None, semente=None):
+        # Um só gerador e as mesmas listas de cartas para todas as sessões: cada sessão só
+        # guarda o seu estado (pontos, vidas, histórico, pesos)
+        self.rng = random.Random(semente)
+        self.baralho = baralho or Baralho(list(LETRAS_NUMEROS.items()))
+        self.sessoes, self.respostas = 0, 0
+
+    def nova_partida(self):
+        return Partida(self.rng, self.baralho.copia_limpa())
+
+    def criar_sessao(self):
+        return SessaoQuiz(self)
+
+    async def mostrar_estatisticas(self):
+        anteriores, antes = 0, time.perf_counter()
+        while True:
+            await asyncio.sleep(INTERVALO_ESTATISTICAS_S)
+            agora = time.perf_counter()
+            print(f"{self.sessoes} sessões, {(self.respostas - anteriores) / (agora - antes):.0f} respostas/s", flush=True)
+            anteriores, antes = self.respostas, agora
+
+
+def aumentar_limite_ficheiros():
+    """Cada sessão é um descritor de ficheiro: sobe o limite suave até ao máximo permitido."""
+    if not resource: return
+    suave, maximo = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if maximo == resource.RLIM_INFINITY: maximo = 1 << 20
+    if suave < maximo:
+        try: resource.setrlimit(resource.RLIMIT_NOFILE, (maximo, maximo))
+        except (ValueError, OSError): pass
+
+
+async def servir(servidor, host="127.0.0.1", porta=PORTA_PADRAO, caminho_unix=None):
+    loop = asyncio.get_running_loop()
+    if caminho_unix:
+        rede = await loop.create_unix_server(servidor.criar_sessao, caminho_unix, backlog=4096)
+    else:
+        rede = await loop.create_server(servidor.criar_sessao, host, porta, backlog=4096)
+    print(f"À escuta em {caminho_unix or f'{host}:{porta}'}", flush=True)
+    estatisticas = asyncio.create_task(servidor.mostrar_estatisticas())
+    try:
+        async with rede: await rede.serve_forever()
+    finally:
+        estatisticas.cancel()
+
+
+# --- Cliente síncrono (usado pela janela) ---
+def abrir_ligacao(endereco, tempo_limite=TEMPO_LIMITE_CLIENTE_S):
+    """`host:porta` liga por TCP; qualquer outra coisa é o caminho de um socket Unix."""
+    host, separador, porta = endereco.rpartition(":")
+    if separador and porta.isdigit():
+        ligacao = socket.create_connection((host or "127.0.0.1", int(porta)), tempo_limite)
+        ligacao.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    else:
+        ligacao = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        ligacao.settimeout(tempo_limite)
+        ligacao.connect(endereco)
+    return ligacao
+
+
+class ErroProtocolo(Exception):
+    """O servidor recusou o pedido (resposta `X mensagem`); a ligação continua válida."""
+
+
+class PartidaRemota:
+    """Mesma interface que logica.Partida, com as regras a correr no servidor.
+
+    O número certo da letra atual não é conhecido antes de responder (`numero_correto` é None).
+    Qualquer falha de rede (incluindo um tempo limite) fecha a ligação: uma resposta atrasada
+    nunca é lida como a resposta do pedido seguinte. Sem ligação, os pedidos falham com
+    ConnectionError; `reiniciar()` volta a ligar, com uma sessão nova no servidor.
+    """
+
+    def __init__(self, endereco, tempo_limite=TEMPO_LIMITE_CLIENTE_S):
+        self.endereco, self.tempo_limite = endereco, tempo_limite
+        self.ligacao = self.leitor = None
+        self.numero_correto = None
+        self.reiniciar()
+
+    def _desligar(self):
+        if self.ligacao is None: return
+        self.leitor.close(); self.ligacao.close()
+        self.ligacao = self.leitor = None
+
+    def _pedir(self, comando):
+        if self.ligacao is None: raise ConnectionError("sem ligação ao servidor")
+        try:
+            self.ligacao.sendall(comando.encode() + b"\n")
+            linha = self.leitor.readline()
+            if not linha: raise ConnectionError("o servidor fechou a ligação")
+        except OSError:
+            self._desligar()
+            raise
+        linha = linha.decode().rstrip("\n")
+        if linha.startswith("X"): raise ErroProtocolo(linha[2:])
+        return linha
+
+    def _aplicar_estado(self, pontuacao, vidas, sequencia, nivel, letra):
+        self.pontuacao, self.vidas, self.acertos_consecutivos = int(pontuacao), int(vidas), int(sequencia)
+        self.dificuldade_mantida, self.letra_sorteada = int(nivel), letra
+
+    def reiniciar(self):
+        if self.ligacao is None:
+            self.ligacao = abrir_ligacao(self.endereco, self.tempo_limite)
+            self.leitor = self.ligacao.makefile("rb")
+        self.letras_erradas_info, self.nivel_anunciado = [], 0
+        self._aplicar_estado(*self._pedir("N").split(" ", 5)[1:])
+
+    @property
+    def terminada(self):
+        return self.vidas <= 0
+
+    @property
+    def iniciada(self):
+        return self.pontuacao > 0 or self.vidas < VIDAS_INICIAIS
+
+    def responder(self, resposta):
+        letra = self.letra_sorteada
+        campos = self._pedir(f"R {resposta}").split(" ")
+        if campos[0] == "C":
+            self._aplicar_estado(*campos[2:6], " ".join(campos[6:]))
+            return ResultadoResposta(True, bonus=int(campos[1]))
+        self._aplicar_estado(*campos[3:7], " ".join(campos[7:]))
+        self.letras_erradas_info.append((letra, int(campos[2])))
+        return ResultadoResposta(False, faixa=campos[1], fim_de_jogo=self.terminada)
+
+    def atualizar_nivel(self):
+        """O servidor já subiu o nível; aqui só se anuncia a subida uma vez, como em Partida."""
+        if self.dificuldade_mantida > self.nivel_anunciado:
+            self.nivel_anunciado = self.dificuldade_mantida
+            return self.dificuldade_mantida
+        return None
+
+    def descricao_nivel(self, nivel):
+        """As cartas do servidor não são conhecidas aqui: só se diz se o baralho fica completo."""
+        return "Todas as cartas" if nivel == len(LETRAS_POR_NIVEL) - 1 else "Mais cartas no sorteio"
+
+    def fechar(self):
+        if self.ligacao is None: return
+        try: self.ligacao.sendall(b"Q\n")
+        except OSError: pass
+        self._desligar()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor de partidas do Adivinhe o Número da Letra")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    parser.add_argument("--unix", metavar="CAMINHO", help="escuta num socket Unix em vez de TCP")
+    parser.add_argument("--baralho", metavar="ARQUIVO", help="cartas deste ficheiro em vez das letras de A a Z")
+    parser.add_argument("--semente", type=int)
+    args = parser.parse_args()
+
+    aumentar_limite_ficheiros()
+    servidor = ServidorQuiz(carregar_baralho(args.baralho) if args.baralho else None, args.semente)
+    try:
+        asyncio.run(servir(servidor, args.host, args.porta, args.unix))
+    except KeyboardInterrupt:
+        pass
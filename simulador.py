@@ -0,0 +1,193 @@
+"""Simulador Monte Carlo para balancear a dificuldade sem jogar à mão.
+
+Joga milhões de partidas em paralelo (NumPy vetorizado dentro de cada lote, um processo por
+núcleo) com as mesmas tabelas de regras de logica.py e um modelo configurável de precisão do
+jogador. Mostra a distribuição de pontuação, a duração das partidas e o tempo até cada nível.
+
+    python simulador.py --jogos 1000000 --modelo por_letra --precisao 0.95 --queda 0.3
+"""
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from logica import (BONUS_SEQUENCIA, LETRAS_POR_NIVEL, SEQUENCIA_POR_NIVEL, TAMANHO_HISTORICO,
+                    VIDAS_INICIAIS)
+
+
+# --- Modelos de precisão do jogador ---
+class PrecisaoConstante:
+    """Acerta com a mesma probabilidade qualquer letra."""
+    def __init__(self, precisao):
+        self.precisao = precisao
+
+    def probabilidade(self, letras, rodada):
+        return np.full(len(letras), self.precisao)
+
+
+class PrecisaoPorLetra:
+    """Letras mais para o fim do alfabeto são mais difíceis: cai `queda` do A ao Z."""
+    def __init__(self, precisao, queda):
+        self.precisao, self.queda = precisao, queda
+
+    def probabilidade(self, letras, rodada):
+        return np.clip(self.precisao - self.queda * letras / 25, 0.0, 1.0)
+
+
+class PrecisaoComAprendizagem:
+    """Começa em `precisao` e aproxima-se de `precisao_final` com o número de rodadas."""
+    def __init__(self, precisao, precisao_final, ritmo):
+        self.precisao, self.precisao_final, self.ritmo = precisao, precisao_final, ritmo
+
+    def probabilidade(self, letras, rodada):
+        p = self.precisao_final - (self.precisao_final - self.precisao) * math.exp(-rodada / self.ritmo)
+        return np.full(len(letras), p)
+
+
+def criar_modelo(args):
+    if args.modelo == "constante": return PrecisaoConstante(args.precisao)
+    if args.modelo == "por_letra": return PrecisaoPorLetra(args.precisao, args.queda)
+    return PrecisaoComAprendizagem(args.precisao, args.precisao_final, args.ritmo)
+
+
+# --- Simulação vetorizada ---
+def sortear_letras(rng, limites, historico):
+    """Sorteia uma letra por partida entre as `limites` primeiras, fora do histórico recente."""
+    letras = (rng.random(len(limites)) * limites).astype(np.int64)
+    repetidas = np.flatnonzero((historico == letras[:, None]).any(axis=1))
+    while len(repetidas):
+        letras[repetidas] = (rng.random(len(repetidas)) * limites[repetidas]).astype(np.int64)
+        repetidas = repetidas[(historico[repetidas] == letras[repetidas, None]).any(axis=1)]
+    return letras
+
+
+def simular_lote(jogos, modelo, semente, max_rodadas):
+    """Joga `jogos` partidas em simultâneo, uma rodada (resposta) de cada vez.
+
+    Devolve pontuação final, número de respostas e a rodada em que cada nível foi atingido
+    (-1 se nunca). Partidas que chegam a `max_rodadas` são cortadas aí.
+    """
+    rng = np.random.default_rng(semente)
+    limites_nivel = np.array(LETRAS_POR_NIVEL)
+    pontuacao = np.zeros(jogos, np.int64)
+    vidas = np.full(jogos, VIDAS_INICIAIS, np.int64)
+    sequencia = np.zeros(jogos, np.int64)
+    nivel = np.zeros(jogos, np.int64)
+    rodadas = np.zeros(jogos, np.int64)
+    rodada_nivel = np.full((jogos, len(LETRAS_POR_NIVEL)), -1, np.int64)
+    rodada_nivel[:, 0] = 0
+    historico = np.full((jogos, TAMANHO_HISTORICO), -1, np.int64)
+
+    ativas = np.arange(jogos)
+    letras = sortear_letras(rng, limites_nivel[nivel], historico)
+    historico[:, 0] = letras
+    for rodada in range(max_rodadas):
+        if len(ativas) == 0: break
+        corretas = rng.random(len(ativas)) < modelo.probabilidade(letras, rodada)
+        rodadas[ativas] += 1
+
+        # Acerto: +1, sequência e bónus (só o maior múltiplo conta)
+        acertaram = ativas[corretas]
+        sequencia[acertaram] += 1
+        bonus = np.zeros(len(acertaram), np.int64)
+        for multiplo, pontos in BONUS_SEQUENCIA:
+            bonus[(bonus == 0) & (sequencia[acertaram] % multiplo == 0)] = pontos
+        pontuacao[acertaram] += 1 + bonus
+
+        # Erro: perde uma vida e a sequência
+        erraram = ativas[~corretas]
+        vidas[erraram] -= 1
+        sequencia[erraram] = 0
+
+        continuam = vidas[ativas] > 0
+        ativas, letras = ativas[continuam], letras[continuam]
+
+        # A próxima letra sai do nível atual; a subida de nível só vale para a seguinte
+        posicao = (rodada + 1) % TAMANHO_HISTORICO
+        letras = sortear_letras(rng, limites_nivel[nivel[ativas]], historico[ativas])
+        historico[ativas, posicao] = letras
+
+        proximo = np.zeros(len(ativas), np.int64)
+        for indice, minimo in enumerate(SEQUENCIA_POR_NIVEL):
+            proximo[sequencia[ativas] >= minimo] = indice
+        subiram = proximo > nivel[ativas]
+        nivel[ativas[subiram]] = proximo[subiram]
+        rodada_nivel[ativas[subiram], proximo[subiram]] = rodada + 1
+    return pontuacao, rodadas, rodada_nivel
+
+
+def _executar_lote(parametros):
+    return simular_lote(*parametros)
+
+
+def simular(jogos, modelo, processos=None, tamanho_lote=200_000, semente=None, max_rodadas=5000):
+    """Divide as partidas em lotes, cada um com a sua semente, e corre-os num pool de processos."""
+    quantidades = [tamanho_lote] * (jogos // tamanho_lote)
+    if jogos % tamanho_lote: quantidades.append(jogos % tamanho_lote)
+    sementes = np.random.SeedSequence(semente).spawn(len(quantidades))
+    tarefas = [(n, modelo, s, max_rodadas) for n, s in zip(quantidades, sementes)]
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        resultados = list(pool.map(_executar_lote, tarefas))
+    return tuple(np.concatenate(partes) for partes in zip(*resultados))
+
+
+def resumir(pontuacao, rodadas, rodada_nivel, segundos_por_resposta):
+    percentis = (10, 25, 50, 75, 90, 99)
+    resumo = {
+        "jogos": len(pontuacao),
+        "pontuacao": {"media": float(pontuacao.mean()), "desvio": float(pontuacao.std()), "max": int(pontuacao.max()),
+                      **{f"p{p}": float(v) for p, v in zip(percentis, np.percentile(pontuacao, percentis))}},
+        "respostas": {"media": float(rodadas.mean()),
+                      **{f"p{p}": float(v) for p, v in zip(percentis, np.percentile(rodadas, percentis))}},
+        "niveis": {},
+    }
+    for nivel in range(1, rodada_nivel.shape[1]):
+        chegaram = rodada_nivel[:, nivel][rodada_nivel[:, nivel] >= 0]
+        info = {"fracao": len(chegaram) / len(pontuacao)}
+        if len(chegaram):
+            mediana = float(np.median(chegaram))
+            info.update(respostas_mediana=mediana, segundos_mediana=mediana * segundos_por_resposta,
+                        respostas_p90=float(np.percentile(chegaram, 90)))
+        resumo["niveis"][nivel] = info
+    return resumo
+
+
+def imprimir(resumo, duracao):
+    p = resumo["pontuacao"]
+    print(f"{resumo['jogos']} partidas em {duracao:.1f}s")
+    print(f"Pontuação: média {p['media']:.1f} ± {p['desvio']:.1f} | p10 {p['p10']:.0f}  p50 {p['p50']:.0f}  p90 {p['p90']:.0f}  p99 {p['p99']:.0f}  máx {p['max']}")
+    r = resumo["respostas"]
+    print(f"Respostas por partida: média {r['media']:.1f} | p50 {r['p50']:.0f}  p90 {r['p90']:.0f}")
+    for nivel, info in resumo["niveis"].items():
+        linha = f"Nível {nivel}: atingido em {info['fracao']:.1%} das partidas"
+        if "respostas_mediana" in info:
+            linha += f", mediana {info['respostas_mediana']:.0f} respostas (~{info['segundos_mediana']:.0f}s)"
+        print(linha)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulação Monte Carlo do Adivinhe o Número da Letra")
+    parser.add_argument("--jogos", type=int, default=1_000_000)
+    parser.add_argument("--modelo", choices=("constante", "por_letra", "aprendizagem"), default="constante")
+    parser.add_argument("--precisao", type=float, default=0.9, help="probabilidade de acerto (inicial)")
+    parser.add_argument("--queda", type=float, default=0.2, help="por_letra: perda de precisão do A ao Z")
+    parser.add_argument("--precisao-final", type=float, default=0.98, help="aprendizagem: precisão a que tende")
+    parser.add_argument("--ritmo", type=float, default=30.0, help="aprendizagem: rodadas para ~63%% da melhoria")
+    parser.add_argument("--segundos-por-resposta", type=float, default=2.5)
+    parser.add_argument("--processos", type=int, default=os.cpu_count())
+    parser.add_argument("--lote", type=int, default=200_000)
+    parser.add_argument("--max-rodadas", type=int, default=5000)
+    parser.add_argument("--semente", type=int)
+    parser.add_argument("--json", help="grava o resumo neste ficheiro")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    resultados = simular(args.jogos, criar_modelo(args), args.processos, args.lote, args.semente, args.max_rodadas)
+    resumo = resumir(*resultados, args.segundos_por_resposta)
+    imprimir(resumo, time.perf_counter() - inicio)
+    if args.json:
+        with open(args.json, 'w') as f: json.dump(resumo, f, indent=2)